@@ -7,7 +7,7 @@ from typing import Any
 from urllib.parse import urlparse
 
 from scripts.scraper.config import DEFAULT_PROVIDERS
-from scripts.scraper.firestore_client import get_firestore_client
+from scripts.scraper.firestore_client import add_storage_arguments, storage_from_args
 
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
@@ -15,7 +15,7 @@ logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(mess
 
 def main() -> None:
     args = parse_args()
-    firestore = get_firestore_client(args.credentials)
+    firestore = storage_from_args(args)
     seen_urls: dict[str, str] = {}
 
     with open(args.csv_path, "r", encoding="utf-8") as handle:
@@ -79,11 +79,7 @@ def main() -> None:
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Import provider URLs into places")
     parser.add_argument("csv_path", help="Path to CSV export")
-    parser.add_argument(
-        "--credentials",
-        help="Path to Firebase service account JSON",
-        default=None,
-    )
+    add_storage_arguments(parser)
     return parser.parse_args()
 
 
@@ -5,7 +5,7 @@ import logging
 from typing import Any
 
 from scripts.scraper.config import DEFAULT_PROVIDERS
-from scripts.scraper.firestore_client import get_firestore_client
+from scripts.scraper.firestore_client import add_storage_arguments, storage_from_args
 from scripts.import_platform_urls import is_valid_url
 
 
@@ -21,7 +21,7 @@ FIELD_ALIASES: dict[str, tuple[str, ...]] = {
 
 def main() -> None:
     args = parse_args()
-    firestore = get_firestore_client(args.credentials)
+    firestore = storage_from_args(args)
 
     docs = firestore.collection("places").stream()
     updated = 0
@@ -45,11 +45,7 @@ def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(
         description="Backfill places.platforms.*.url from existing fields"
     )
-    parser.add_argument(
-        "--credentials",
-        help="Path to Firebase service account JSON",
-        default=None,
-    )
+    add_storage_arguments(parser)
     parser.add_argument(
         "--dry-run",
         action="store_true",
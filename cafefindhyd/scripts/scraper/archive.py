@@ -0,0 +1,264 @@
+from __future__ import annotations
+
+import gzip
+import hashlib
+import logging
+import sqlite3
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Callable, Iterator
+
+from .config import ARCHIVE_MAX_AGE_DAYS, ARCHIVE_MAX_BYTES
+
+try:
+    import zstandard
+except ImportError:  # gzip is always available; zstd is smaller and faster.
+    zstandard = None
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS objects (
+    digest TEXT PRIMARY KEY,
+    codec TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    stored_at TEXT NOT NULL,
+    last_used TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS entries (
+    place_id TEXT NOT NULL,
+    provider_key TEXT NOT NULL,
+    fetched_at TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    url TEXT NOT NULL,
+    digest TEXT NOT NULL REFERENCES objects(digest),
+    PRIMARY KEY (place_id, provider_key, fetched_at, kind)
+);
+CREATE INDEX IF NOT EXISTS entries_url ON entries (url, fetched_at);
+CREATE INDEX IF NOT EXISTS objects_last_used ON objects (last_used);
+"""
+
+
+@dataclass(frozen=True)
+class ArchiveEntry:
+    place_id: str
+    provider_key: str
+    fetched_at: datetime
+    kind: str
+    url: str
+    digest: str
+
+
+class PageArchive:
+    """Compressed, content-addressed store of fetched response bodies.
+
+    Bodies are stored once per sha256 digest under ``objects/``; the SQLite
+    index maps (place_id, provider_key, fetched_at, kind) to a digest. When
+    the archive grows past ``max_bytes`` the least recently used objects are
+    evicted. Entries older than ``max_age_days`` are dropped when an archive
+    that stored pages is closed.
+    """
+
+    def __init__(
+        self,
+        root: str | Path,
+        max_bytes: int = ARCHIVE_MAX_BYTES,
+        max_age_days: int | None = ARCHIVE_MAX_AGE_DAYS,
+    ) -> None:
+        self.root = Path(root)
+        self._objects_dir = self.root / "objects"
+        self._objects_dir.mkdir(parents=True, exist_ok=True)
+        self._max_bytes = max_bytes
+        self._max_age_days = max_age_days
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(
+            self.root / "index.sqlite", check_same_thread=False
+        )
+        self._db.executescript(_SCHEMA)
+        # Kept up to date on insert and delete so storing stays O(1).
+        self._total_bytes = self._db.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM objects"
+        ).fetchone()[0]
+        self._stored = False
+
+    def store(
+        self,
+        place_id: str,
+        provider_key: str,
+        url: str,
+        body: str,
+        fetched_at: datetime,
+        kind: str = "page",
+    ) -> str:
+        raw = body.encode("utf-8")
+        digest = hashlib.sha256(raw).hexdigest()
+        now = _isoformat(datetime.now(timezone.utc))
+        with self._lock:
+            row = self._db.execute(
+                "SELECT codec, size FROM objects WHERE digest = ?", (digest,)
+            ).fetchone()
+            if row and self._object_path(digest, row[0]).exists():
+                self._db.execute(
+                    "UPDATE objects SET last_used = ? WHERE digest = ?", (now, digest)
+                )
+            else:
+                if row:
+                    # Indexed, but the file is gone; its row is replaced.
+                    self._total_bytes -= row[1]
+                codec, payload = _compress(raw)
+                path = self._object_path(digest, codec)
+                path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = path.with_suffix(path.suffix + ".tmp")
+                tmp_path.write_bytes(payload)
+                tmp_path.replace(path)
+                self._db.execute(
+                    "INSERT OR REPLACE INTO objects VALUES (?, ?, ?, ?, ?)",
+                    (digest, codec, len(payload), now, now),
+                )
+                self._total_bytes += len(payload)
+            self._db.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?)",
+                (place_id, provider_key, _isoformat(fetched_at), kind, url, digest),
+            )
+            self._db.commit()
+            self._stored = True
+            if self._total_bytes > self._max_bytes:
+                self._evict_locked()
+        return digest
+
+    def read(self, digest: str) -> str:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT codec FROM objects WHERE digest = ?", (digest,)
+            ).fetchone()
+            if not row:
+                raise LookupError(f"Archived body {digest} not found")
+            self._db.execute(
+                "UPDATE objects SET last_used = ? WHERE digest = ?",
+                (_isoformat(datetime.now(timezone.utc)), digest),
+            )
+            self._db.commit()
+        payload = self._object_path(digest, row[0]).read_bytes()
+        return _decompress(row[0], payload).decode("utf-8")
+
+    def latest_body(self, url: str) -> str:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT digest FROM entries WHERE url = ? "
+                "ORDER BY fetched_at DESC LIMIT 1",
+                (url,),
+            ).fetchone()
+        if not row:
+            raise LookupError(f"No archived body for {url}")
+        return self.read(row[0])
+
+    def latest_entries(self, kind: str = "page") -> Iterator[ArchiveEntry]:
+        """Most recent entry of ``kind`` for every (place_id, provider_key)."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT place_id, provider_key, MAX(fetched_at), kind, url, digest "
+                "FROM entries WHERE kind = ? GROUP BY place_id, provider_key",
+                (kind,),
+            ).fetchall()
+        for place_id, provider_key, fetched_at, entry_kind, url, digest in rows:
+            yield ArchiveEntry(
+                place_id=place_id,
+                provider_key=provider_key,
+                fetched_at=datetime.fromisoformat(fetched_at),
+                kind=entry_kind,
+                url=url,
+                digest=digest,
+            )
+
+    def recording_fetcher(
+        self,
+        place_id: str,
+        provider_key: str,
+        fetch: Callable[[str], tuple[int, str]],
+    ) -> Callable[[str], tuple[int, str]]:
+        """Wrap a follow-up fetch so successful bodies are archived too."""
+
+        def fetch_and_store(url: str) -> tuple[int, str]:
+            status_code, body = fetch(url)
+            if status_code < 400:
+                self.store(
+                    place_id,
+                    provider_key,
+                    url,
+                    body,
+                    datetime.now(timezone.utc),
+                    kind="data",
+                )
+            return status_code, body
+
+        return fetch_and_store
+
+    def close(self) -> None:
+        with self._lock:
+            if self._stored:
+                self._expire_locked()
+            self._db.close()
+
+    def _object_path(self, digest: str, codec: str) -> Path:
+        return self._objects_dir / digest[:2] / f"{digest}.{codec}"
+
+    def _evict_locked(self) -> None:
+        """Drop least recently used objects until the archive fits its cap."""
+        excess = self._total_bytes - self._max_bytes
+        evicted: list[tuple[str, str, int]] = []
+        for digest, codec, size in self._db.execute(
+            "SELECT digest, codec, size FROM objects ORDER BY last_used"
+        ):
+            if excess <= 0:
+                break
+            evicted.append((digest, codec, size))
+            excess -= size
+        self._delete_objects_locked(evicted)
+        logging.info("Archive evicted %s objects", len(evicted))
+
+    def _expire_locked(self) -> None:
+        """Drop entries past ``max_age_days`` and the objects left unused."""
+        if self._max_age_days is None:
+            return
+        cutoff = datetime.now(timezone.utc) - timedelta(days=self._max_age_days)
+        self._db.execute(
+            "DELETE FROM entries WHERE fetched_at < ?", (_isoformat(cutoff),)
+        )
+        orphans = self._db.execute(
+            "SELECT digest, codec, size FROM objects WHERE digest NOT IN "
+            "(SELECT digest FROM entries)"
+        ).fetchall()
+        self._delete_objects_locked(orphans)
+        self._db.commit()
+
+    def _delete_objects_locked(self, objects: list[tuple[str, str, int]]) -> None:
+        if not objects:
+            return
+        for digest, codec, size in objects:
+            self._object_path(digest, codec).unlink(missing_ok=True)
+            self._total_bytes -= size
+        digests = [(digest,) for digest, _, _ in objects]
+        self._db.executemany("DELETE FROM entries WHERE digest = ?", digests)
+        self._db.executemany("DELETE FROM objects WHERE digest = ?", digests)
+        self._db.commit()
+
+
+def _compress(raw: bytes) -> tuple[str, bytes]:
+    if zstandard is not None:
+        return "zst", zstandard.ZstdCompressor(level=10).compress(raw)
+    return "gz", gzip.compress(raw, compresslevel=6)
+
+
+def _decompress(codec: str, payload: bytes) -> bytes:
+    if codec == "zst":
+        if zstandard is None:
+            raise RuntimeError("zstandard is required to read .zst archive objects")
+        return zstandard.ZstdDecompressor().decompress(payload)
+    return gzip.decompress(payload)
+
+
+def _isoformat(value: datetime) -> str:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).isoformat()
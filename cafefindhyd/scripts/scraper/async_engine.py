@@ -0,0 +1,306 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import defaultdict
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from typing import Callable, Mapping
+
+import aiohttp
+
+from .config import (
+    ASYNC_CONCURRENCY,
+    ASYNC_PARSE_WORKERS,
+    BREAKER_MAX_WAIT_SECONDS,
+    HEDGE_MIN_SAMPLES,
+    REQUEST_TIMEOUT_SECONDS,
+)
+from .breaker import parse_retry_after
+from .models import ProviderParseResult, ScrapeTask
+from .scheduler import Requeue
+from .sessions import get_session
+from .tasks import (
+    ScrapeContext,
+    TaskOutcome,
+    conditional_headers,
+    failure_result,
+    finish_task,
+    handle_response,
+    retry_or_fail,
+)
+from .throttling import Slot
+from .utils import abandon_on_error
+
+# Longest a waiter sleeps without a wake-up before re-checking for a stop.
+_STOP_CHECK_SECONDS = 0.5
+
+
+def run_tasks_async(
+    context: ScrapeContext,
+    tasks: list[ScrapeTask],
+    on_result: Callable[[ProviderParseResult], None],
+    concurrency: int = ASYNC_CONCURRENCY,
+) -> None:
+    """Run the tasks, passing each result to ``on_result`` as it finishes.
+
+    ``on_result`` runs on the event loop thread, like the thread engine's
+    result handling runs on the dispatching thread.
+    """
+    asyncio.run(_run_tasks(context, tasks, on_result, concurrency))
+
+
+async def _run_tasks(
+    context: ScrapeContext,
+    tasks: list[ScrapeTask],
+    on_result: Callable[[ProviderParseResult], None],
+    concurrency: int,
+) -> None:
+    # Domain turns and the semaphore are FIFO, so creating coroutines in
+    # value order makes each domain serve its most valuable tasks first.
+    tasks = sorted(tasks, key=lambda task: task.value, reverse=True)
+    limit = asyncio.Semaphore(concurrency)
+    slots = _DomainSlots(context)
+    connector = aiohttp.TCPConnector(limit=concurrency, ttl_dns_cache=300)
+    timeout = aiohttp.ClientTimeout(total=REQUEST_TIMEOUT_SECONDS)
+    headers = dict(get_session().headers)
+    with abandon_on_error(
+        ThreadPoolExecutor(max_workers=ASYNC_PARSE_WORKERS)
+    ) as parse_executor:
+        async with aiohttp.ClientSession(
+            connector=connector, timeout=timeout, headers=headers
+        ) as session:
+
+            async def run_and_report(task: ScrapeTask) -> None:
+                result = await _run_task(
+                    context, session, limit, slots, parse_executor, task
+                )
+                # Tasks that never started because of a shutdown return None.
+                if result is not None:
+                    on_result(result)
+
+            await asyncio.gather(*(run_and_report(task) for task in tasks))
+
+
+async def _run_task(
+    context: ScrapeContext,
+    session: aiohttp.ClientSession,
+    limit: asyncio.Semaphore,
+    slots: _DomainSlots,
+    parse_executor: Executor,
+    task: ScrapeTask,
+) -> ProviderParseResult | None:
+    if not task.domain:
+        return finish_task(context, task, failure_result(task, "error", "Invalid URL"))
+
+    # A rejected or retried fetch hands the task back; after its backoff it
+    # waits for the domain (or is deferred) like any other task.
+    while True:
+        outcome = await _fetch_task(
+            context, session, limit, slots, parse_executor, task
+        )
+        if not isinstance(outcome, Requeue):
+            break
+        task = outcome.task
+        if not await _sleep_unless_stopped(context, outcome.delay):
+            return None
+    if isinstance(outcome, Future):
+        return await asyncio.wrap_future(outcome)
+    return outcome
+
+
+async def _fetch_task(
+    context: ScrapeContext,
+    session: aiohttp.ClientSession,
+    limit: asyncio.Semaphore,
+    slots: _DomainSlots,
+    parse_executor: Executor,
+    task: ScrapeTask,
+) -> TaskOutcome | None:
+    loop = asyncio.get_running_loop()
+    wait_started = time.perf_counter()
+    # The domain slot comes first: waiting on a slow or open domain must not
+    # hold one of the global slots other domains could use.
+    slot = await slots.acquire(task.domain)
+    if slot is None:
+        return None
+    try:
+        async with limit:
+            task_started = time.monotonic()
+            context.metrics.observe(
+                "throttleWait",
+                (time.perf_counter() - wait_started) * 1000,
+                task.provider_key,
+                task.domain,
+            )
+            try:
+                with context.metrics.timer("http", task.provider_key, task.domain):
+                    status_code, headers, raw_body, body = await _hedged_get(
+                        context, slots, session, task
+                    )
+                context.throttle.record_response(
+                    task.domain,
+                    status_code,
+                    time.monotonic() - task_started,
+                    parse_retry_after(headers.get("Retry-After")),
+                    probe=slot.probe,
+                )
+                context.metrics.add_bytes(
+                    len(raw_body), task.provider_key, task.domain
+                )
+            except (aiohttp.ClientError, asyncio.TimeoutError) as exc:
+                if isinstance(
+                    exc, (aiohttp.ClientConnectionError, asyncio.TimeoutError)
+                ):
+                    context.throttle.record_timeout(task.domain)
+                message = str(exc) or exc.__class__.__name__
+                return retry_or_fail(
+                    context, task, message, retryable=_is_transient(exc)
+                )
+    finally:
+        slots.release(slot)
+
+    # Parsing is CPU-bound (and EazyDiner makes a blocking request), so keep
+    # it off the event loop; with a parse pool it continues in a subprocess.
+    outcome = await loop.run_in_executor(
+        parse_executor, handle_response, context, task, status_code, body, headers
+    )
+    if context.budget is not None:
+        context.budget.observe(task.domain, time.monotonic() - task_started)
+    return outcome
+
+
+async def _hedged_get(
+    context: ScrapeContext,
+    slots: _DomainSlots,
+    session: aiohttp.ClientSession,
+    task: ScrapeTask,
+) -> tuple[int, Mapping[str, str], bytes, str]:
+    """GET the task URL, racing a second copy if the first is unusually slow.
+
+    The hedge waits for the domain's ``hedge_percentile`` latency and needs
+    a free throttle slot, so only domains already allowed more than one
+    request in flight are ever hedged.
+    """
+    headers = conditional_headers(task)
+    percentile = context.retry.hedge_percentile
+    threshold_ms = (
+        context.metrics.percentile(
+            "http", percentile / 100, task.domain, HEDGE_MIN_SAMPLES
+        )
+        if percentile is not None
+        else None
+    )
+    primary = asyncio.ensure_future(_get(session, task.url, headers))
+    if threshold_ms is None:
+        return await primary
+    done, _ = await asyncio.wait({primary}, timeout=threshold_ms / 1000)
+    if done:
+        return await primary
+    hedge_slot = context.throttle.try_acquire(task.domain)
+    if hedge_slot is None:
+        return await primary
+
+    logging.info("Hedging %s after %.0fms", task.url, threshold_ms)
+    hedge = asyncio.ensure_future(_get(session, task.url, headers))
+    pending = {primary, hedge}
+    try:
+        while True:
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
+            )
+            # A failed copy only counts once the other one failed as well.
+            for finished in done:
+                if finished.exception() is None:
+                    return finished.result()
+            if not pending:
+                return done.pop().result()
+    finally:
+        for request in pending:
+            request.cancel()
+        slots.release(hedge_slot)
+
+
+async def _get(
+    session: aiohttp.ClientSession, url: str, headers: dict[str, str]
+) -> tuple[int, Mapping[str, str], bytes, str]:
+    async with session.get(url, headers=headers) as response:
+        raw_body = await response.read()
+        body = await response.text(errors="replace")
+        return response.status, response.headers, raw_body, body
+
+
+def _is_transient(exc: Exception) -> bool:
+    if isinstance(exc, aiohttp.ClientSSLError):
+        return False
+    return isinstance(
+        exc,
+        (
+            aiohttp.ClientConnectionError,
+            aiohttp.ClientPayloadError,
+            asyncio.TimeoutError,
+        ),
+    )
+
+
+async def _sleep_unless_stopped(context: ScrapeContext, seconds: float) -> bool:
+    """Sleep in short steps; False if the run started stopping meanwhile."""
+    deadline = time.monotonic() + seconds
+    while not context.stop.is_set():
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return True
+        await asyncio.sleep(min(remaining, _STOP_CHECK_SECONDS))
+    return False
+
+
+class _DomainSlots:
+    """Throttle slots for coroutines, handed out per domain in FIFO order.
+
+    Only the head waiter of a domain polls the throttle. It sleeps until the
+    domain's ready time, or until ``release`` signals a freed slot, and
+    gives up (None) when the run stops, the budget runs out or the circuit
+    stays open too long.
+    """
+
+    def __init__(self, context: ScrapeContext) -> None:
+        self._context = context
+        self._turns: dict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
+        self._released: dict[str, asyncio.Event] = defaultdict(asyncio.Event)
+
+    async def acquire(self, domain: str) -> Slot | None:
+        throttle = self._context.throttle
+        async with self._turns[domain]:
+            released = self._released[domain]
+            while True:
+                if not self._admits(domain):
+                    return None
+                slot = throttle.try_acquire(domain)
+                if slot is not None:
+                    return slot
+                released.clear()
+                delay = throttle.ready_at(domain) - time.monotonic()
+                try:
+                    await asyncio.wait_for(
+                        released.wait(), min(max(delay, 0.0), _STOP_CHECK_SECONDS)
+                    )
+                except asyncio.TimeoutError:
+                    pass
+
+    def release(self, slot: Slot) -> None:
+        self._context.throttle.release(slot)
+        self._released[slot.domain].set()
+
+    def _admits(self, domain: str) -> bool:
+        context = self._context
+        if context.stop.is_set():
+            return False
+        budget = context.budget
+        open_seconds = context.throttle.open_seconds(domain)
+        if open_seconds > BREAKER_MAX_WAIT_SECONDS or (
+            budget is not None and not budget.admits(domain, starts_in=open_seconds)
+        ):
+            if budget is not None:
+                budget.defer()
+            return False
+        return True
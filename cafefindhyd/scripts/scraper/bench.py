@@ -0,0 +1,238 @@
+from __future__ import annotations
+
+import argparse
+import json
+import re
+import statistics
+import sys
+import time
+import tracemalloc
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import Any, Callable
+
+from .config import BENCH_TOLERANCE, FIXTURES_DIR
+from .normalization import normalize_offer_text
+from .providers.eazydiner import _extract_offer_texts_from_json
+from .providers.swiggy_dineout import SwiggyDineoutParser
+from .providers.zomato import ZomatoParser
+
+
+BASELINE_PATH = FIXTURES_DIR / "bench_baseline.json"
+_PEAK_SLACK_KB = 64
+_MIN_SECONDS = 1.0
+
+
+def main() -> None:
+    args = parse_args()
+    fixtures_dir = Path(args.fixtures)
+    benchmarks = build_benchmarks(fixtures_dir)
+    if args.only:
+        benchmarks = {name: bench for name, bench in benchmarks.items() if name in args.only}
+
+    # Throughput is compared relative to a fixed stdlib workload, so the
+    # baseline carries over between machines. The reference is timed between
+    # benchmarks and each one uses the faster of its neighbouring timings,
+    # which evens out CPU frequency changes during the run.
+    reference_items, run_reference = reference_workload()
+
+    def time_reference() -> float:
+        return measure(reference_items, run_reference, args.rounds)["items_per_sec"]
+
+    report: dict[str, dict[str, float]] = {}
+    reference = time_reference()
+    for name, (items, run_item) in benchmarks.items():
+        if not items:
+            print(f"{name}: no fixtures, skipped")
+            continue
+        stats = report[name] = measure(items, run_item, args.rounds)
+        after = time_reference()
+        stats["relative"] = stats["items_per_sec"] / max(reference, after)
+        reference = after
+        print(
+            f"{name:<16} {stats['items_per_sec']:>10.1f}/s  "
+            f"x{stats['relative']:.4f} ref  "
+            f"p50 {stats['p50_ms']:.3f} ms  p99 {stats['p99_ms']:.3f} ms  "
+            f"peak {stats['peak_kb']:.0f} KiB"
+        )
+
+    baseline_path = Path(args.baseline)
+    if args.update_baseline:
+        rounded = {
+            name: {
+                key: round(value, 6 if key == "relative" else 3)
+                for key, value in stats.items()
+            }
+            for name, stats in report.items()
+        }
+        baseline_path.write_text(json.dumps(rounded, indent=2, sort_keys=True) + "\n")
+        print(f"baseline written to {baseline_path}")
+        return
+
+    if not baseline_path.exists():
+        print(f"no baseline at {baseline_path}; run with --update-baseline")
+        return
+    baseline = json.loads(baseline_path.read_text())
+    regressions = compare(report, baseline, args.tolerance)
+    for line in regressions:
+        print(f"REGRESSION {line}")
+    if regressions:
+        sys.exit(1)
+    print(f"no regressions against {baseline_path.name} (tolerance {args.tolerance:.0%})")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Offline parser throughput benchmark")
+    parser.add_argument(
+        "--fixtures",
+        default=str(FIXTURES_DIR),
+        help="Fixture directory with one sub-directory per provider",
+    )
+    parser.add_argument(
+        "--baseline",
+        default=str(BASELINE_PATH),
+        help="Baseline JSON to compare against (or write)",
+    )
+    parser.add_argument(
+        "--rounds",
+        type=int,
+        default=20,
+        help="Passes over the fixture set per benchmark",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=BENCH_TOLERANCE,
+        help="Allowed slowdown / memory growth versus the baseline (0.3 = 30%%)",
+    )
+    parser.add_argument(
+        "--only",
+        action="append",
+        help="Run only the named benchmark (repeatable)",
+    )
+    parser.add_argument(
+        "--update-baseline",
+        action="store_true",
+        help="Write the results as the new baseline instead of comparing",
+    )
+    return parser.parse_args()
+
+
+def build_benchmarks(
+    fixtures_dir: Path,
+) -> dict[str, tuple[list[Any], Callable[[Any], Any]]]:
+    zomato = ZomatoParser()
+    swiggy = SwiggyDineoutParser()
+    zomato_pages = _read_texts(fixtures_dir / "zomato", "*.html")
+    swiggy_pages = _read_texts(fixtures_dir / "swiggy_dineout", "*.html")
+    eazydiner_payloads = [
+        json.loads(text) for text in _read_texts(fixtures_dir / "eazydiner", "*.json")
+    ]
+    offer_texts_path = fixtures_dir / "offer_texts.txt"
+    offer_texts = (
+        [line for line in offer_texts_path.read_text(encoding="utf-8").splitlines() if line]
+        if offer_texts_path.exists()
+        else []
+    )
+    return {
+        "zomato": (zomato_pages, lambda html: zomato.parse(html, "bench")),
+        "swiggy_dineout": (swiggy_pages, lambda html: swiggy.parse(html, "bench")),
+        "eazydiner_json": (eazydiner_payloads, _extract_offer_texts_from_json),
+        "normalize": (
+            offer_texts,
+            lambda text: normalize_offer_text(text, "bench", "bench"),
+        ),
+    }
+
+
+def measure(
+    items: list[Any], run_item: Callable[[Any], Any], rounds: int
+) -> dict[str, float]:
+    for item in items:  # warm-up (imports, regex caches)
+        run_item(item)
+
+    # Run at least ``rounds`` passes and at least ``_MIN_SECONDS`` so fast
+    # benchmarks are not dominated by timer noise; throughput comes from the
+    # fastest pass, which is least affected by other load on the machine.
+    latencies: list[float] = []
+    round_times: list[float] = []
+    started = time.perf_counter()
+    while len(round_times) < max(rounds, 1) or (
+        time.perf_counter() - started < _MIN_SECONDS
+    ):
+        round_started = time.perf_counter()
+        for item in items:
+            item_started = time.perf_counter()
+            run_item(item)
+            latencies.append(time.perf_counter() - item_started)
+        round_times.append(time.perf_counter() - round_started)
+
+    # Separate pass: tracemalloc slows allocation-heavy code considerably.
+    tracemalloc.start()
+    for item in items:
+        run_item(item)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    latencies.sort()
+    return {
+        "items_per_sec": len(items) / min(round_times),
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000,
+        "peak_kb": peak / 1024,
+    }
+
+
+def compare(
+    report: dict[str, dict[str, float]],
+    baseline: dict[str, dict[str, float]],
+    tolerance: float,
+) -> list[str]:
+    regressions: list[str] = []
+    for name, stats in report.items():
+        expected = baseline.get(name)
+        if not expected:
+            continue
+        if "relative" not in expected:
+            continue
+        floor = expected["relative"] * (1 - tolerance)
+        if stats["relative"] < floor:
+            regressions.append(
+                f"{name}: x{stats['relative']:.4f} ref < x{floor:.4f} "
+                f"(baseline x{expected['relative']:.4f})"
+            )
+        # Small absolute slack so near-zero peaks do not flag allocator noise.
+        ceiling = expected["peak_kb"] * (1 + tolerance) + _PEAK_SLACK_KB
+        if stats["peak_kb"] > ceiling:
+            regressions.append(
+                f"{name}: peak {stats['peak_kb']:.0f} KiB > {ceiling:.0f} KiB "
+                f"(baseline {expected['peak_kb']:.0f} KiB)"
+            )
+    return regressions
+
+
+def reference_workload() -> tuple[list[str], Callable[[str], Any]]:
+    """Stdlib-only HTML tokenizing and regex work, similar in kind to parsing."""
+    rows = "".join(
+        f'<div class="offer" data-id="{i}"><span>Flat {i}% off</span>'
+        f"<p>Up to Rs {i * 25} on bills above Rs {i * 100}</p></div>"
+        for i in range(200)
+    )
+    pages = [f"<html><body>{rows}</body></html>"] * 5
+    pattern = re.compile(r"(\d+)% off")
+
+    def run(page: str) -> int:
+        tokenizer = HTMLParser()
+        tokenizer.feed(page)
+        tokenizer.close()
+        return len(pattern.findall(page))
+
+    return pages, run
+
+
+def _read_texts(directory: Path, pattern: str) -> list[str]:
+    return [path.read_text(encoding="utf-8") for path in sorted(directory.glob(pattern))]
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import itertools
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+from .config import BREAKER_BASE_OPEN_SECONDS, BREAKER_MAX_OPEN_SECONDS
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+@dataclass
+class BreakerState:
+    state: str = CLOSED
+    trips: int = 0
+    open_until: float = 0.0
+    # ID of the half-open probe in flight, if any.
+    probe: int | None = None
+
+
+class CircuitBreaker:
+    """Per-domain circuit breaker for 403/429 responses.
+
+    A rejection opens the circuit for ``base * 2**(trips - 1)`` seconds
+    (capped), or for the server's ``Retry-After`` when that is longer. Once
+    the open period ends the circuit is half-open: a single probe request is
+    let through; its success closes it, another rejection re-opens it with
+    a longer backoff. Each probe gets an ID so only that request's verdict
+    (or release) counts, not a straggler sent before the circuit opened.
+    Times are ``time.monotonic()`` values. Not thread-safe
+    on its own; ``DomainThrottle`` calls it under its lock.
+    """
+
+    def __init__(
+        self,
+        base_open_seconds: float = BREAKER_BASE_OPEN_SECONDS,
+        max_open_seconds: float = BREAKER_MAX_OPEN_SECONDS,
+    ) -> None:
+        self._base_open_seconds = base_open_seconds
+        self._max_open_seconds = max_open_seconds
+        self._states: dict[str, BreakerState] = {}
+        self._probe_ids = itertools.count(1)
+
+    def state(self, domain: str) -> BreakerState:
+        return self._states.setdefault(domain, BreakerState())
+
+    def allows(self, domain: str, now: float) -> bool:
+        """Whether a request may start now; claims the probe when half-open."""
+        state = self.state(domain)
+        if state.state == OPEN:
+            if now < state.open_until:
+                return False
+            state.state = HALF_OPEN
+            state.probe = None
+        if state.state == HALF_OPEN:
+            if state.probe is not None:
+                return False
+            state.probe = next(self._probe_ids)
+        return True
+
+    def probe(self, domain: str) -> int | None:
+        """ID of the domain's half-open probe in flight, if any."""
+        state = self.state(domain)
+        return state.probe if state.state == HALF_OPEN else None
+
+    def ready_at(self, domain: str) -> float:
+        """Earliest monotonic time a request may start (inf while probing)."""
+        state = self.state(domain)
+        if state.state == OPEN:
+            return state.open_until
+        if state.state == HALF_OPEN and state.probe is not None:
+            return float("inf")
+        return 0.0
+
+    def open_seconds(self, domain: str, now: float) -> float:
+        """Seconds until an open circuit turns half-open (0 if not open)."""
+        state = self.state(domain)
+        if state.state != OPEN:
+            return 0.0
+        return max(0.0, state.open_until - now)
+
+    def record_success(self, domain: str, probe: int | None = None) -> None:
+        """Close a half-open circuit when the response came from its probe.
+
+        Successes from requests sent before the circuit opened can still
+        arrive while it is open or probing; they say nothing about whether
+        the domain recovered, so they are ignored.
+        """
+        state = self.state(domain)
+        if state.state == HALF_OPEN and probe is not None and probe == state.probe:
+            self._states[domain] = BreakerState()
+
+    def record_rejection(
+        self, domain: str, now: float, retry_after: float | None = None
+    ) -> float:
+        """Open the circuit; returns how many seconds it stays open."""
+        state = self.state(domain)
+        state.trips += 1
+        seconds = min(
+            self._base_open_seconds * 2 ** (state.trips - 1), self._max_open_seconds
+        )
+        if retry_after is not None:
+            seconds = min(max(seconds, retry_after), self._max_open_seconds)
+        state.state = OPEN
+        state.open_until = max(state.open_until, now + seconds)
+        state.probe = None
+        return seconds
+
+    def snapshot(self, now: float) -> dict[str, tuple[int, float]]:
+        """``(trips, seconds still open)`` for every domain not fully closed."""
+        return {
+            domain: (state.trips, self.open_seconds(domain, now))
+            for domain, state in self._states.items()
+            if state.trips
+        }
+
+    def restore(self, domain: str, trips: int, open_seconds: float, now: float) -> None:
+        """Re-open a circuit saved by an earlier run.
+
+        An already expired period still leaves the circuit open, so the first
+        request after a restart is a half-open probe.
+        """
+        if trips <= 0:
+            return
+        self._states[domain] = BreakerState(
+            state=OPEN,
+            trips=trips,
+            open_until=now + min(max(open_seconds, 0.0), self._max_open_seconds),
+        )
+
+    def release_probe(self, domain: str, probe: int) -> None:
+        """A half-open probe ended without a verdict (e.g. network error)."""
+        state = self.state(domain)
+        if state.state == HALF_OPEN and state.probe == probe:
+            state.probe = None
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Seconds from a Retry-After header (delta-seconds or HTTP date)."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import threading
+import time
+
+from .config import DEADLINE_DEFAULT_TASK_SECONDS, DEADLINE_RESERVE_SECONDS
+
+
+class TimeBudget:
+    """Admission control for runs that must finish by a deadline.
+
+    Keeps a per-domain moving average of task duration (fetch plus inline
+    parse) and only admits a task if it is expected to finish before the
+    deadline, minus a reserve for draining parses and the final flush.
+    Queues are value-ordered, so what gets cut is the least valuable work.
+    """
+
+    def __init__(
+        self,
+        deadline: float,
+        reserve_seconds: float = DEADLINE_RESERVE_SECONDS,
+        default_task_seconds: float = DEADLINE_DEFAULT_TASK_SECONDS,
+        smoothing: float = 0.3,
+    ) -> None:
+        self.deadline = deadline
+        self._reserve_seconds = reserve_seconds
+        self._default_task_seconds = default_task_seconds
+        self._smoothing = smoothing
+        self._task_seconds: dict[str, float] = {}
+        self._lock = threading.Lock()
+        self.deferred = 0
+
+    @classmethod
+    def from_seconds(cls, seconds: float, **kwargs) -> "TimeBudget":
+        return cls(time.monotonic() + seconds, **kwargs)
+
+    def remaining_seconds(self) -> float:
+        return self.deadline - self._reserve_seconds - time.monotonic()
+
+    def task_seconds(self, domain: str) -> float:
+        with self._lock:
+            return self._task_seconds.get(domain, self._default_task_seconds)
+
+    def observe(self, domain: str, seconds: float) -> None:
+        with self._lock:
+            previous = self._task_seconds.get(domain)
+            self._task_seconds[domain] = (
+                seconds
+                if previous is None
+                else previous + self._smoothing * (seconds - previous)
+            )
+
+    def admits(self, domain: str, starts_in: float = 0.0) -> bool:
+        return starts_in + self.task_seconds(domain) <= self.remaining_seconds()
+
+    def defer(self, count: int = 1) -> None:
+        with self._lock:
+            self.deferred += count
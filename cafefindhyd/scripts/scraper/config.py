@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from pathlib import Path
 
 
 @dataclass(frozen=True)
@@ -33,12 +34,62 @@ DEFAULT_PROVIDERS: dict[str, ProviderConfig] = {
     ),
 }
 
+PARSER_VERSION = "0.1.0"
 GLOBAL_CONCURRENCY = 4
+PLACE_OFFERS_BATCH_SIZE = 100
+PLACE_OFFERS_LOAD_CONCURRENCY = 4
+FIRESTORE_BATCH_LIMIT = 500
+WRITE_FLUSH_THRESHOLD = 50
+WRITE_FLUSH_INTERVAL_SECONDS = 10.0
 DOMAIN_JITTER_SECONDS = (5, 20)
+DOMAIN_MAX_IN_FLIGHT = 1
+QUEUE_REPORT_INTERVAL_SECONDS = 60.0
+ASYNC_CONCURRENCY = 100
+ASYNC_PARSE_WORKERS = 4
+PARSE_WORKERS = 2
+ARCHIVE_MAX_BYTES = 500 * 1024 * 1024
+ARCHIVE_MAX_AGE_DAYS = 30
 BLOCK_BACKOFF_HOURS = 6
+BREAKER_BASE_OPEN_SECONDS = 60.0
+BREAKER_MAX_OPEN_SECONDS = BLOCK_BACKOFF_HOURS * 3600
+# The scheduler defers a domain's tasks rather than wait longer than this.
+BREAKER_MAX_WAIT_SECONDS = 600.0
+# A task rejected this often is written as an error instead of requeued.
+BREAKER_MAX_REJECTIONS = 3
 REQUEST_TIMEOUT_SECONDS = 20
+RETRY_MAX_ATTEMPTS = 3
+RETRY_BASE_SECONDS = 2.0
+RETRY_MAX_SECONDS = 60.0
+RETRY_STATUS_CODES = (500, 502, 503, 504)
+HEDGE_MIN_SAMPLES = 20
+HTML_PARSER_BACKEND = "auto"
+HTTP_POOL_CONNECTIONS = 10
+HTTP_POOL_MAXSIZE = 8
 USER_AGENT = (
     "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
     "AppleWebKit/537.36 (KHTML, like Gecko) "
     "Chrome/120.0.0.0 Safari/537.36"
 )
+
+FIXTURES_DIR = Path(__file__).resolve().parent.parent / "fixtures"
+BENCH_TOLERANCE = 0.3
+LOCAL_STORE_PATH = ".scrape-store.sqlite3"
+LEDGER_CHECKPOINT_SECONDS = 30.0
+DEFAULT_PLACE_RANK = 999
+MAX_OVERDUE_RATIO = 7.0
+FAILURE_PENALTY = 0.5
+DEADLINE_RESERVE_SECONDS = 60.0
+DEADLINE_DEFAULT_TASK_SECONDS = 3.0
+CHANGE_HISTORY_SIZE = 10
+CHANGE_HISTORY_MIN_FETCHES = 4
+REFRESH_MIN_HOURS = 6
+REFRESH_MAX_HOURS = 168
+REFRESH_MAX_GROWTH = 2.0
+THROTTLE_MAX_DELAY_SECONDS = 120.0
+THROTTLE_DELAY_STEP_SECONDS = 1.0
+THROTTLE_BACKOFF_FACTOR = 2.0
+THROTTLE_INCREASE_AFTER = 5
+THROTTLE_LATENCY_SPIKE_FACTOR = 4.0
+THROTTLE_LATENCY_SPIKE_MIN_SECONDS = 1.0
+THROTTLE_MAX_IN_FLIGHT = 2
+THROTTLE_STATE_PATH = ".scrape-throttle.json"
@@ -1,11 +1,17 @@
 from __future__ import annotations
 
+import argparse
 import os
 from typing import Optional
 
 import firebase_admin
 from firebase_admin import credentials, firestore
 
+from .config import LOCAL_STORE_PATH
+
+
+STORAGE_BACKENDS = ("firestore", "sqlite")
+
 
 def get_firestore_client(credentials_path: Optional[str] = None) -> firestore.Client:
     if not firebase_admin._apps:
@@ -21,5 +27,46 @@ def get_firestore_client(credentials_path: Optional[str] = None) -> firestore.Cl
     return firestore.client()
 
 
+def get_storage_client(
+    backend: str = "firestore",
+    credentials_path: Optional[str] = None,
+    sqlite_path: Optional[str] = None,
+):
+    """Return Firestore or a local store exposing the same client calls."""
+    if backend == "firestore":
+        return get_firestore_client(credentials_path)
+
+    from .local_store import MemoryFirestore, SqliteFirestore
+
+    if backend == "sqlite":
+        return SqliteFirestore(sqlite_path or LOCAL_STORE_PATH)
+    if backend == "memory":
+        return MemoryFirestore()
+    raise ValueError(f"Unknown storage backend: {backend}")
+
+
+def add_storage_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--credentials",
+        help="Path to Firebase service account JSON",
+        default=None,
+    )
+    parser.add_argument(
+        "--backend",
+        choices=STORAGE_BACKENDS,
+        default=os.getenv("SCRAPER_STORAGE_BACKEND", "firestore"),
+        help="Where places and offers are read and written",
+    )
+    parser.add_argument(
+        "--sqlite-path",
+        default=None,
+        help=f"SQLite file for --backend sqlite (default: {LOCAL_STORE_PATH})",
+    )
+
+
+def storage_from_args(args: argparse.Namespace):
+    return get_storage_client(args.backend, args.credentials, args.sqlite_path)
+
+
 def server_timestamp() -> firestore.SERVER_TIMESTAMP:
     return firestore.SERVER_TIMESTAMP
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import logging
+import time
+from typing import Any, Iterable
+
+from .config import LEDGER_CHECKPOINT_SECONDS
+from .firestore_client import server_timestamp
+from .writer import PlaceOffersWriter
+
+
+def task_key(place_id: str, provider_key: str) -> str:
+    return f"{place_id}/{provider_key}"
+
+
+class RunLedger:
+    """Checkpointed record of which planned tasks a run has finished.
+
+    Stored under ``ledger`` in the scrapeRuns document. A task only counts as
+    completed once the writer has committed its placeOffers update, so a
+    checkpoint always flushes the writer first; anything after the last
+    checkpoint is simply redone on resume.
+    """
+
+    def __init__(
+        self,
+        run_ref,
+        writer: PlaceOffersWriter,
+        completed: Iterable[str] = (),
+        interval: float = LEDGER_CHECKPOINT_SECONDS,
+    ) -> None:
+        self._run_ref = run_ref
+        self._writer = writer
+        self._interval = interval
+        self._completed = set(completed)
+        self._unsaved = 0
+        self._last_checkpoint = time.monotonic()
+
+    @property
+    def completed(self) -> set[str]:
+        return set(self._completed)
+
+    def plan(self, keys: Iterable[str]) -> None:
+        self._run_ref.set({"ledger": {"planned": sorted(keys)}}, merge=True)
+
+    def complete(self, key: str) -> None:
+        self._completed.add(key)
+        self._unsaved += 1
+        if time.monotonic() - self._last_checkpoint >= self._interval:
+            self.checkpoint()
+
+    def checkpoint(self) -> None:
+        self._last_checkpoint = time.monotonic()
+        if not self._unsaved:
+            return
+        if not self._writer.flush():
+            logging.warning("Ledger checkpoint skipped: placeOffers flush failed")
+            return
+        self._run_ref.set(
+            {
+                "ledger": {
+                    "completed": sorted(self._completed),
+                    "checkpointedAt": server_timestamp(),
+                }
+            },
+            merge=True,
+        )
+        self._unsaved = 0
+
+
+def load_ledger(run_ref) -> tuple[dict[str, Any], set[str], set[str]]:
+    """Return the run document, planned keys and completed keys for a resume."""
+    snapshot = run_ref.get()
+    if not snapshot.exists:
+        raise LookupError(f"Run not found: {run_ref.id}")
+    run = snapshot.to_dict() or {}
+    ledger = run.get("ledger") or {}
+    if "planned" not in ledger:
+        raise LookupError(f"Run {run_ref.id} has no task ledger to resume")
+    return run, set(ledger.get("planned") or []), set(ledger.get("completed") or [])
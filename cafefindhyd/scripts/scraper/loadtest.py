@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import time
+
+from .local_store import MemoryFirestore, SqliteFirestore
+from .mock_server import MockBehavior, start_mock_servers
+from .scraper import parse_args as parse_scraper_args
+from .scraper import run_scraper
+
+
+def seed_places(firestore, servers, count: int) -> None:
+    places = firestore.collection("places")
+    for index in range(count):
+        places.document(f"load-{index:05d}").set(
+            {
+                "name": f"Load Test Place {index}",
+                "slug": f"place-{index}",
+                "platforms": {
+                    provider_key: {"url": server.url_for(index)}
+                    for provider_key, server in servers.items()
+                },
+            }
+        )
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Run the scraper end to end against local mock providers"
+    )
+    parser.add_argument("--places", type=int, default=50)
+    parser.add_argument("--engine", choices=("thread", "async"), default="thread")
+    parser.add_argument("--concurrency", type=int, default=None)
+    parser.add_argument("--parse-workers", type=int, default=0)
+    parser.add_argument(
+        "--jitter-seconds", type=float, nargs=2, default=(0.0, 0.05)
+    )
+    parser.add_argument("--latency", type=float, nargs=2, default=(0.01, 0.05))
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--forbidden-rate", type=float, default=0.0)
+    parser.add_argument("--unavailable-rate", type=float, default=0.0)
+    parser.add_argument(
+        "--retry-after", type=int, default=1, help="Retry-After sent with 429s"
+    )
+    parser.add_argument(
+        "--breaker-open-seconds",
+        type=float,
+        default=1.0,
+        help="Scraper circuit-breaker base open period",
+    )
+    parser.add_argument("--chunk-delay", type=float, default=0.0)
+    parser.add_argument(
+        "--sqlite-path",
+        default=None,
+        help="Use a SQLite store at this path instead of memory",
+    )
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    behavior = MockBehavior(
+        latency_seconds=tuple(args.latency),
+        rate_limit_rate=args.rate_limit_rate,
+        forbidden_rate=args.forbidden_rate,
+        unavailable_rate=args.unavailable_rate,
+        retry_after_seconds=args.retry_after,
+        chunk_delay_seconds=args.chunk_delay,
+    )
+    servers = start_mock_servers(behavior)
+    try:
+        firestore = (
+            SqliteFirestore(args.sqlite_path) if args.sqlite_path else MemoryFirestore()
+        )
+        seed_places(firestore, servers, args.places)
+        scraper_args = [
+            "--engine",
+            args.engine,
+            "--parse-workers",
+            str(args.parse_workers),
+            "--jitter-seconds",
+            *(str(value) for value in args.jitter_seconds),
+            "--breaker-open-seconds",
+            str(args.breaker_open_seconds),
+            # Rates learned against the mock servers must not leak into
+            # real runs.
+            "--throttle-state",
+            "",
+        ]
+        if args.concurrency:
+            scraper_args += ["--concurrency", str(args.concurrency)]
+
+        started = time.perf_counter()
+        counts = run_scraper(parse_scraper_args(scraper_args), firestore)
+        elapsed = time.perf_counter() - started
+    finally:
+        for server in servers.values():
+            server.stop()
+
+    total = sum(counts.values())
+    requests = sum(server.stats.requests for server in servers.values())
+    rejected = sum(
+        server.stats.rate_limited + server.stats.forbidden
+        for server in servers.values()
+    )
+    report = {
+        "engine": args.engine,
+        "places": args.places,
+        "tasks": total,
+        "seconds": round(elapsed, 3),
+        "tasks_per_second": round(total / elapsed, 2) if elapsed else 0.0,
+        "rejected_rate": round(rejected / requests, 4) if requests else 0.0,
+        "counts": counts,
+        "servers": {key: server.stats.as_dict() for key, server in servers.items()},
+    }
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    print(
+        f"{report['tasks']} tasks in {report['seconds']}s "
+        f"({report['tasks_per_second']} tasks/s), "
+        f"rejected rate {report['rejected_rate']:.1%}"
+    )
+    print(f"counts: {counts}")
+    for provider_key, stats in report["servers"].items():
+        print(f"{provider_key}: {stats}")
+
+
+if __name__ == "__main__":
+    logging.getLogger().setLevel(logging.WARNING)
+    main()
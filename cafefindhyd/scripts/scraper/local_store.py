@@ -0,0 +1,447 @@
+from __future__ import annotations
+
+import argparse
+import copy
+import json
+import logging
+import operator
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Iterable, Iterator
+
+from firebase_admin import firestore as firebase_firestore
+from google.api_core.exceptions import NotFound
+
+# Range operators compare like Firestore: only values of the same type match.
+_RANGE_OPERATORS = {
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+}
+QUERY_OPERATORS = ("==", "in", *_RANGE_OPERATORS)
+
+
+class _LocalFirestore(ABC):
+    """Shared client surface for the local stand-ins of the Firestore client.
+
+    Supports ``collection().document()`` get/set(merge)/update, collection
+    ``stream()``, ``where(field, op, value).limit(n)`` for the operators in
+    ``QUERY_OPERATORS``, ``get_all`` with
+    field masks and ``batch()``. ``SERVER_TIMESTAMP`` is stored as the
+    current UTC time. Subclasses only provide document storage.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.RLock()
+
+    def collection(self, name: str) -> "LocalCollection":
+        return LocalCollection(self, name)
+
+    def batch(self) -> "LocalWriteBatch":
+        return LocalWriteBatch()
+
+    def get_all(
+        self,
+        references: Iterable["LocalDocumentReference"],
+        field_paths: Iterable[str] | None = None,
+    ) -> Iterator["LocalSnapshot"]:
+        paths = list(field_paths) if field_paths is not None else None
+        for reference in references:
+            snapshot = reference.get()
+            if snapshot.exists and paths is not None:
+                snapshot = LocalSnapshot(
+                    reference, _project(snapshot.to_dict() or {}, paths)
+                )
+            yield snapshot
+
+    def close(self) -> None:
+        pass
+
+    # Storage primitives; every read returns a copy the caller may mutate.
+
+    @abstractmethod
+    def _read(self, collection: str, doc_id: str) -> dict[str, Any] | None:
+        ...
+
+    @abstractmethod
+    def _write(self, collection: str, doc_id: str, data: dict[str, Any]) -> None:
+        ...
+
+    @abstractmethod
+    def _scan(self, collection: str) -> list[tuple[str, dict[str, Any]]]:
+        ...
+
+    def _query(
+        self, collection: str, filters: tuple[tuple[str, str, Any], ...]
+    ) -> list[tuple[str, dict[str, Any]]]:
+        return [
+            (doc_id, data)
+            for doc_id, data in self._scan(collection)
+            if _matches(data, filters)
+        ]
+
+
+class MemoryFirestore(_LocalFirestore):
+    """Keeps documents in process memory; meant for load tests and benchmarks."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._collections: dict[str, dict[str, dict[str, Any]]] = {}
+
+    def _read(self, collection: str, doc_id: str) -> dict[str, Any] | None:
+        with self._lock:
+            data = self._collections.get(collection, {}).get(doc_id)
+            return copy.deepcopy(data) if data is not None else None
+
+    def _write(self, collection: str, doc_id: str, data: dict[str, Any]) -> None:
+        with self._lock:
+            self._collections.setdefault(collection, {})[doc_id] = copy.deepcopy(data)
+
+    def _scan(self, collection: str) -> list[tuple[str, dict[str, Any]]]:
+        with self._lock:
+            return [
+                (doc_id, copy.deepcopy(data))
+                for doc_id, data in self._collections.get(collection, {}).items()
+            ]
+
+
+class SqliteFirestore(_LocalFirestore):
+    """Keeps documents as JSON rows in a SQLite file for offline runs.
+
+    Equality filters on string and number fields are pushed down to SQLite
+    with ``json_extract`` so slug/name lookups do not decode every document.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        super().__init__()
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(path), check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS documents (
+                collection TEXT NOT NULL,
+                doc_id TEXT NOT NULL,
+                data TEXT NOT NULL,
+                PRIMARY KEY (collection, doc_id)
+            )
+            """
+        )
+        self._db.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+    def _read(self, collection: str, doc_id: str) -> dict[str, Any] | None:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT data FROM documents WHERE collection = ? AND doc_id = ?",
+                (collection, doc_id),
+            ).fetchone()
+        return _decode(row[0]) if row else None
+
+    def _write(self, collection: str, doc_id: str, data: dict[str, Any]) -> None:
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO documents (collection, doc_id, data) "
+                "VALUES (?, ?, ?)",
+                (collection, doc_id, _encode(data)),
+            )
+            self._db.commit()
+
+    def _scan(self, collection: str) -> list[tuple[str, dict[str, Any]]]:
+        return self._select(collection, (), ())
+
+    def _query(
+        self, collection: str, filters: tuple[tuple[str, str, Any], ...]
+    ) -> list[tuple[str, dict[str, Any]]]:
+        clauses: list[str] = []
+        params: list[Any] = []
+        for field_path, op, value in filters:
+            if op != "==":
+                continue
+            if isinstance(value, (str, int, float)) and not isinstance(value, bool):
+                clauses.append("json_extract(data, ?) = ?")
+                params += [_json_path(field_path), value]
+        rows = self._select(collection, clauses, params)
+        # Filters that could not be pushed down are checked here.
+        return [(doc_id, data) for doc_id, data in rows if _matches(data, filters)]
+
+    def _select(
+        self, collection: str, clauses: Iterable[str], params: Iterable[Any]
+    ) -> list[tuple[str, dict[str, Any]]]:
+        where = " AND ".join(["collection = ?", *clauses])
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT doc_id, data FROM documents WHERE {where} ORDER BY doc_id",
+                (collection, *params),
+            ).fetchall()
+        return [(doc_id, _decode(data)) for doc_id, data in rows]
+
+
+class LocalCollection:
+    def __init__(self, store: _LocalFirestore, name: str) -> None:
+        self._store = store
+        self.id = name
+
+    def document(self, doc_id: str) -> "LocalDocumentReference":
+        return LocalDocumentReference(self._store, self.id, doc_id)
+
+    def stream(self) -> Iterator["LocalSnapshot"]:
+        for doc_id, data in self._store._scan(self.id):
+            yield LocalSnapshot(self.document(doc_id), data)
+
+    def where(self, field: str, op: str, value: Any) -> "LocalQuery":
+        return LocalQuery(self).where(field, op, value)
+
+    def limit(self, count: int) -> "LocalQuery":
+        return LocalQuery(self).limit(count)
+
+
+class LocalQuery:
+    def __init__(
+        self,
+        collection: LocalCollection,
+        filters: tuple[tuple[str, str, Any], ...] = (),
+        limit: int | None = None,
+    ) -> None:
+        self._collection = collection
+        self._filters = filters
+        self._limit = limit
+
+    def where(self, field: str, op: str, value: Any) -> "LocalQuery":
+        if op not in QUERY_OPERATORS:
+            raise ValueError(
+                f"Unsupported query operator {op!r}; "
+                f"use one of {', '.join(QUERY_OPERATORS)}"
+            )
+        if op == "in" and not isinstance(value, (list, tuple)):
+            raise ValueError("The 'in' operator needs a list of values")
+        return LocalQuery(
+            self._collection, self._filters + ((field, op, value),), self._limit
+        )
+
+    def limit(self, count: int) -> "LocalQuery":
+        return LocalQuery(self._collection, self._filters, count)
+
+    def stream(self) -> Iterator["LocalSnapshot"]:
+        collection = self._collection
+        rows = collection._store._query(collection.id, self._filters)
+        for doc_id, data in rows[: self._limit]:
+            yield LocalSnapshot(collection.document(doc_id), data)
+
+
+class LocalDocumentReference:
+    def __init__(self, store: _LocalFirestore, collection: str, doc_id: str) -> None:
+        self._store = store
+        self._collection = collection
+        self.id = doc_id
+
+    @property
+    def path(self) -> str:
+        return f"{self._collection}/{self.id}"
+
+    def get(self) -> "LocalSnapshot":
+        return LocalSnapshot(self, self._store._read(self._collection, self.id))
+
+    def set(self, data: dict[str, Any], merge: bool = False) -> None:
+        resolved = _resolve_sentinels(data)
+        with self._store._lock:
+            current = self._store._read(self._collection, self.id) if merge else None
+            self._store._write(
+                self._collection, self.id, _deep_merge(current or {}, resolved)
+            )
+
+    def update(self, data: dict[str, Any]) -> None:
+        with self._store._lock:
+            current = self._store._read(self._collection, self.id)
+            if current is None:
+                raise NotFound(f"No document to update: {self.path}")
+            for field_path, value in _resolve_sentinels(data).items():
+                _set_path(current, field_path, value)
+            self._store._write(self._collection, self.id, current)
+
+
+class LocalSnapshot:
+    def __init__(
+        self, reference: LocalDocumentReference, data: dict[str, Any] | None
+    ) -> None:
+        self.reference = reference
+        self.id = reference.id
+        self._data = data
+
+    @property
+    def exists(self) -> bool:
+        return self._data is not None
+
+    def to_dict(self) -> dict[str, Any] | None:
+        return copy.deepcopy(self._data) if self._data is not None else None
+
+
+class LocalWriteBatch:
+    def __init__(self) -> None:
+        self._writes: list[tuple[LocalDocumentReference, dict[str, Any], bool]] = []
+
+    def set(
+        self, reference: LocalDocumentReference, data: dict[str, Any], merge: bool = False
+    ) -> None:
+        self._writes.append((reference, data, merge))
+
+    def commit(self) -> None:
+        writes, self._writes = self._writes, []
+        for reference, data, merge in writes:
+            reference.set(data, merge=merge)
+
+
+def _resolve_sentinels(value: Any) -> Any:
+    if value is firebase_firestore.SERVER_TIMESTAMP:
+        return datetime.now(timezone.utc)
+    if isinstance(value, dict):
+        return {key: _resolve_sentinels(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_resolve_sentinels(item) for item in value]
+    return value
+
+
+def _deep_merge(base: dict[str, Any], updates: dict[str, Any]) -> dict[str, Any]:
+    for key, value in updates.items():
+        if isinstance(value, dict) and isinstance(base.get(key), dict):
+            _deep_merge(base[key], value)
+        else:
+            base[key] = copy.deepcopy(value)
+    return base
+
+
+def _matches(data: dict[str, Any], filters: tuple[tuple[str, str, Any], ...]) -> bool:
+    return all(
+        _compare(_get_path(data, field), op, value) for field, op, value in filters
+    )
+
+
+def _compare(field_value: Any, op: str, value: Any) -> bool:
+    if op == "==":
+        return field_value == value
+    if op == "in":
+        return field_value in value
+    if field_value is None or not _same_type(field_value, value):
+        return False
+    return _RANGE_OPERATORS[op](field_value, value)
+
+
+def _same_type(left: Any, right: Any) -> bool:
+    if isinstance(left, bool) or isinstance(right, bool):
+        return type(left) is type(right)
+    if isinstance(left, (int, float)) and isinstance(right, (int, float)):
+        return True
+    return type(left) is type(right)
+
+
+def _get_path(data: dict[str, Any], field_path: str) -> Any:
+    current: Any = data
+    for part in field_path.split("."):
+        if not isinstance(current, dict) or part not in current:
+            return None
+        current = current[part]
+    return current
+
+
+def _set_path(data: dict[str, Any], field_path: str, value: Any) -> None:
+    parts = field_path.split(".")
+    current = data
+    for part in parts[:-1]:
+        child = current.get(part)
+        if not isinstance(child, dict):
+            child = current[part] = {}
+        current = child
+    current[parts[-1]] = value
+
+
+def _project(data: dict[str, Any], field_paths: list[str]) -> dict[str, Any]:
+    projected: dict[str, Any] = {}
+    for field_path in field_paths:
+        value = _get_path(data, field_path)
+        if value is not None:
+            _set_path(projected, field_path, copy.deepcopy(value))
+    return projected
+
+
+def _json_path(field_path: str) -> str:
+    return "$" + "".join(f'."{part}"' for part in field_path.split("."))
+
+
+def _encode(data: dict[str, Any]) -> str:
+    return json.dumps(data, default=_encode_value, ensure_ascii=False)
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"__datetime__": value.isoformat()}
+    if hasattr(value, "latitude") and hasattr(value, "longitude"):
+        return {"latitude": value.latitude, "longitude": value.longitude}
+    # References and other Firestore types are kept as text.
+    return str(value)
+
+
+def _decode(payload: str) -> dict[str, Any]:
+    return json.loads(payload, object_hook=_decode_object)
+
+
+def _decode_object(value: dict[str, Any]) -> Any:
+    if len(value) == 1 and "__datetime__" in value:
+        return datetime.fromisoformat(value["__datetime__"])
+    return value
+
+
+def copy_collections(source, target, names: Iterable[str]) -> dict[str, int]:
+    copied: dict[str, int] = {}
+    for name in names:
+        count = 0
+        for doc in source.collection(name).stream():
+            target.collection(name).document(doc.id).set(doc.to_dict() or {})
+            count += 1
+        copied[name] = count
+    return copied
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Copy Firestore collections into a local SQLite store"
+    )
+    parser.add_argument("sqlite_path", help="SQLite file to create or update")
+    parser.add_argument(
+        "--credentials",
+        help="Path to Firebase service account JSON",
+        default=None,
+    )
+    parser.add_argument(
+        "--collection",
+        action="append",
+        help="Collection to copy (repeatable, default: places and placeOffers)",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    from .firestore_client import get_firestore_client
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    args = parse_args()
+    target = SqliteFirestore(args.sqlite_path)
+    try:
+        copied = copy_collections(
+            get_firestore_client(args.credentials),
+            target,
+            args.collection or ["places", "placeOffers"],
+        )
+    finally:
+        target.close()
+    logging.info("Copied %s", copied)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+from __future__ import annotations
+
+import json
+import math
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterator
+
+from .utils import write_atomic
+
+
+class RunMetrics:
+    """Phase timings and per-provider / per-domain histograms for one run.
+
+    Durations are recorded in milliseconds under a metric name (``http``,
+    ``parse``, ``write``, ...). ``summary()`` reduces them to count, p50,
+    p95 and max for the scrapeRuns document. With ``trace=True`` every timed
+    span is also kept so the run can be dumped as a Chrome/Perfetto trace.
+    """
+
+    def __init__(self, trace: bool = False) -> None:
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter()
+        self._phases: dict[str, float] = defaultdict(float)
+        self._samples: dict[tuple[str, str, str], list[float]] = defaultdict(list)
+        self._bytes: dict[tuple[str, str], int] = defaultdict(int)
+        self._trace_events: list[dict[str, Any]] | None = [] if trace else None
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self._phases[name] += elapsed
+            self._trace(name, "phase", started, elapsed, {})
+
+    def add_phase(self, name: str, seconds: float) -> None:
+        with self._lock:
+            self._phases[name] += seconds
+
+    @contextmanager
+    def timer(
+        self, metric: str, provider: str | None = None, domain: str | None = None
+    ) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(
+                metric, (time.perf_counter() - started) * 1000, provider, domain
+            )
+            self._trace(
+                metric,
+                "task",
+                started,
+                time.perf_counter() - started,
+                {"provider": provider, "domain": domain},
+            )
+
+    def observe(
+        self,
+        metric: str,
+        milliseconds: float,
+        provider: str | None = None,
+        domain: str | None = None,
+    ) -> None:
+        with self._lock:
+            self._samples[("run", "", metric)].append(milliseconds)
+            if provider:
+                self._samples[("providers", provider, metric)].append(milliseconds)
+            if domain:
+                self._samples[("domains", domain, metric)].append(milliseconds)
+
+    def percentile(
+        self, metric: str, fraction: float, domain: str, min_samples: int = 1
+    ) -> float | None:
+        """A domain's running percentile in ms; None with too few samples."""
+        with self._lock:
+            values = sorted(self._samples.get(("domains", domain, metric), ()))
+        if len(values) < min_samples:
+            return None
+        return _percentile(values, fraction)
+
+    def add_bytes(self, size: int, provider: str | None, domain: str | None) -> None:
+        with self._lock:
+            self._bytes[("run", "")] += size
+            if provider:
+                self._bytes[("providers", provider)] += size
+            if domain:
+                self._bytes[("domains", domain)] += size
+
+    def summary(self) -> dict[str, Any]:
+        with self._lock:
+            samples = {key: list(values) for key, values in self._samples.items()}
+            downloaded = dict(self._bytes)
+            phases = dict(self._phases)
+
+        summary: dict[str, Any] = {
+            "phases": {name: round(seconds, 3) for name, seconds in phases.items()},
+            "run": {},
+            "providers": {},
+            "domains": {},
+        }
+        for (scope, key, metric), values in samples.items():
+            _section(summary, scope, key)[f"{metric}Ms"] = _histogram(values)
+        for (scope, key), size in downloaded.items():
+            _section(summary, scope, key)["bytes"] = size
+        return summary
+
+    def write_prometheus(self, path: str | Path) -> None:
+        """Write a node_exporter textfile for the latest run; replaced atomically."""
+        summary = self.summary()
+        lines = [
+            "# HELP scraper_phase_seconds Wall time spent in each run phase.",
+            "# TYPE scraper_phase_seconds gauge",
+        ]
+        for name, seconds in summary["phases"].items():
+            lines.append(f'scraper_phase_seconds{{phase="{name}"}} {seconds}')
+        durations: list[str] = []
+        downloaded: list[str] = []
+        sections = [("", summary["run"])]
+        for scope, label in (("providers", "provider"), ("domains", "domain")):
+            sections += [
+                (f'{label}="{key}",', section)
+                for key, section in summary[scope].items()
+            ]
+        for labels, section in sections:
+            for metric, value in section.items():
+                if metric == "bytes":
+                    downloaded.append(
+                        f"scraper_downloaded_bytes{{{labels.rstrip(',')}}} {value}"
+                    )
+                    continue
+                name = metric[: -len("Ms")]
+                for stat in ("p50", "p95", "max"):
+                    durations.append(
+                        f'scraper_task_milliseconds{{{labels}metric="{name}",'
+                        f'stat="{stat}"}} {value[stat]}'
+                    )
+        # Each family's samples must follow its own TYPE line.
+        lines += [
+            "# HELP scraper_task_milliseconds Per-task durations by metric.",
+            "# TYPE scraper_task_milliseconds gauge",
+            *durations,
+            "# HELP scraper_downloaded_bytes Response bytes downloaded.",
+            "# TYPE scraper_downloaded_bytes gauge",
+            *downloaded,
+        ]
+        write_atomic(path, "\n".join(lines) + "\n")
+
+    def write_trace(self, path: str | Path) -> None:
+        """Write spans in the Chrome trace event format (chrome://tracing)."""
+        with self._lock:
+            events = list(self._trace_events or [])
+        write_atomic(path, json.dumps({"traceEvents": events}))
+
+    def _trace(
+        self,
+        name: str,
+        category: str,
+        started: float,
+        elapsed: float,
+        args: dict[str, Any],
+    ) -> None:
+        if self._trace_events is None:
+            return
+        event = {
+            "name": name,
+            "cat": category,
+            "ph": "X",
+            "ts": round((started - self._origin) * 1_000_000),
+            "dur": round(elapsed * 1_000_000),
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+            "args": {key: value for key, value in args.items() if value},
+        }
+        with self._lock:
+            self._trace_events.append(event)
+
+
+def _section(summary: dict[str, Any], scope: str, key: str) -> dict[str, Any]:
+    if scope == "run":
+        return summary["run"]
+    return summary[scope].setdefault(key, {})
+
+
+def _histogram(values: list[float]) -> dict[str, float]:
+    values.sort()
+    return {
+        "count": len(values),
+        "p50": round(_percentile(values, 0.50), 2),
+        "p95": round(_percentile(values, 0.95), 2),
+        "max": round(values[-1], 2),
+    }
+
+
+def _percentile(ordered: list[float], fraction: float) -> float:
+    # Nearest-rank percentile over already sorted samples.
+    index = max(0, math.ceil(fraction * len(ordered)) - 1)
+    return ordered[index]
@@ -0,0 +1,288 @@
+from __future__ import annotations
+
+import argparse
+import hashlib
+import logging
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from .config import FIXTURES_DIR
+
+
+_EAZYDINER_BUILD_ID = "mock-build"
+_EAZYDINER_PAGE = (
+    "<html><head>"
+    f'<script src="/_next/static/{_EAZYDINER_BUILD_ID}/_buildManifest.js"></script>'
+    "</head><body><h1>{slug}</h1></body></html>"
+)
+_EAZYDINER_DATA_RE = re.compile(
+    rf"^/_next/data/{re.escape(_EAZYDINER_BUILD_ID)}/(.+)\.json$"
+)
+
+# Page routes per provider; the captured name picks a fixture by hash.
+_ROUTES = {
+    "zomato": re.compile(r"^/hyderabad/([^/]+)$"),
+    "swiggy_dineout": re.compile(r"^/restaurants/(\d+)/dineout$"),
+    "eazydiner": re.compile(r"^/hyderabad/([^/]+)$"),
+}
+
+MOCK_PATHS = {
+    "zomato": "/hyderabad/{name}",
+    "swiggy_dineout": "/restaurants/{number}/dineout",
+    "eazydiner": "/hyderabad/{name}",
+}
+
+
+@dataclass
+class MockBehavior:
+    latency_seconds: tuple[float, float] = (0.0, 0.0)
+    rate_limit_rate: float = 0.0
+    forbidden_rate: float = 0.0
+    unavailable_rate: float = 0.0
+    retry_after_seconds: int = 60
+    # Send bodies in chunks with a pause between them to mimic slow origins.
+    chunk_delay_seconds: float = 0.0
+    chunk_size: int = 16 * 1024
+
+
+@dataclass
+class MockStats:
+    requests: int = 0
+    not_modified: int = 0
+    rate_limited: int = 0
+    forbidden: int = 0
+    unavailable: int = 0
+    not_found: int = 0
+    bytes_sent: int = 0
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def add(self, **increments: int) -> None:
+        with self.lock:
+            for name, value in increments.items():
+                setattr(self, name, getattr(self, name) + value)
+
+    def as_dict(self) -> dict[str, int]:
+        with self.lock:
+            return {
+                "requests": self.requests,
+                "not_modified": self.not_modified,
+                "rate_limited": self.rate_limited,
+                "forbidden": self.forbidden,
+                "unavailable": self.unavailable,
+                "not_found": self.not_found,
+                "bytes_sent": self.bytes_sent,
+            }
+
+
+class MockProviderServer:
+    """Serves fixture pages for one provider on its own port.
+
+    Each provider gets a separate port so the scraper's per-domain throttle
+    treats them as separate hosts, as it would in production.
+    """
+
+    def __init__(
+        self,
+        provider_key: str,
+        behavior: MockBehavior | None = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        fixtures_dir: Path = FIXTURES_DIR,
+    ) -> None:
+        self.provider_key = provider_key
+        self.behavior = behavior or MockBehavior()
+        self.stats = MockStats()
+        self._pages = _load_fixtures(fixtures_dir / provider_key)
+        if not self._pages:
+            raise ValueError(f"No fixtures for provider: {provider_key}")
+        self._server = ThreadingHTTPServer((host, port), _make_handler(self))
+        self._server.daemon_threads = True
+        self._thread: threading.Thread | None = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def url_for(self, index: int) -> str:
+        path = MOCK_PATHS[self.provider_key].format(
+            name=f"place-{index}", number=100000 + index
+        )
+        return self.base_url + path
+
+    def start(self) -> "MockProviderServer":
+        self._thread = threading.Thread(
+            target=self._server.serve_forever,
+            name=f"mock-{self.provider_key}",
+            daemon=True,
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> "MockProviderServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def resolve(self, path: str) -> tuple[bytes, str] | None:
+        if self.provider_key == "eazydiner":
+            match = _EAZYDINER_DATA_RE.match(path)
+            if match:
+                return self._pick(match.group(1)), "application/json"
+            match = _ROUTES["eazydiner"].match(path)
+            if match:
+                page = _EAZYDINER_PAGE.replace("{slug}", match.group(1))
+                return page.encode("utf-8"), "text/html; charset=utf-8"
+            return None
+        match = _ROUTES[self.provider_key].match(path)
+        if not match:
+            return None
+        return self._pick(match.group(1)), "text/html; charset=utf-8"
+
+    def _pick(self, name: str) -> bytes:
+        digest = hashlib.sha256(name.encode("utf-8")).digest()
+        return self._pages[digest[0] % len(self._pages)]
+
+
+def _load_fixtures(directory: Path) -> list[bytes]:
+    if not directory.is_dir():
+        return []
+    return [
+        path.read_bytes()
+        for path in sorted(directory.iterdir())
+        if path.suffix in {".html", ".json"}
+    ]
+
+
+def _make_handler(server: MockProviderServer) -> type[BaseHTTPRequestHandler]:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self) -> None:
+            behavior = server.behavior
+            server.stats.add(requests=1)
+            low, high = behavior.latency_seconds
+            if high > 0:
+                time.sleep(random.uniform(low, high))
+
+            roll = random.random()
+            if roll < behavior.rate_limit_rate:
+                server.stats.add(rate_limited=1)
+                self._send_empty(
+                    429, {"Retry-After": str(behavior.retry_after_seconds)}
+                )
+                return
+            if roll < behavior.rate_limit_rate + behavior.forbidden_rate:
+                server.stats.add(forbidden=1)
+                self._send_empty(403)
+                return
+            if roll < (
+                behavior.rate_limit_rate
+                + behavior.forbidden_rate
+                + behavior.unavailable_rate
+            ):
+                server.stats.add(unavailable=1)
+                self._send_empty(503)
+                return
+
+            resolved = server.resolve(self.path.split("?", 1)[0])
+            if resolved is None:
+                server.stats.add(not_found=1)
+                self._send_empty(404)
+                return
+            body, content_type = resolved
+            etag = '"' + hashlib.sha256(body).hexdigest()[:16] + '"'
+            if self.headers.get("If-None-Match") == etag:
+                server.stats.add(not_modified=1)
+                self._send_empty(304, {"ETag": etag})
+                return
+
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("ETag", etag)
+            if behavior.chunk_delay_seconds > 0:
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                for start in range(0, len(body), behavior.chunk_size):
+                    chunk = body[start : start + behavior.chunk_size]
+                    self.wfile.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+                    self.wfile.flush()
+                    time.sleep(behavior.chunk_delay_seconds)
+                self.wfile.write(b"0\r\n\r\n")
+            else:
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            server.stats.add(bytes_sent=len(body))
+
+        def _send_empty(self, status: int, headers: dict[str, str] | None = None) -> None:
+            self.send_response(status)
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def log_message(self, format: str, *args) -> None:
+            logging.debug("mock %s: " + format, server.provider_key, *args)
+
+    return Handler
+
+
+def start_mock_servers(
+    behavior: MockBehavior | None = None,
+    providers: tuple[str, ...] = tuple(_ROUTES),
+) -> dict[str, MockProviderServer]:
+    return {
+        provider_key: MockProviderServer(provider_key, behavior).start()
+        for provider_key in providers
+    }
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Serve fixture pages per provider")
+    parser.add_argument("--latency", type=float, nargs=2, default=(0.0, 0.0))
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--forbidden-rate", type=float, default=0.0)
+    parser.add_argument("--unavailable-rate", type=float, default=0.0)
+    parser.add_argument("--retry-after", type=int, default=60)
+    parser.add_argument("--chunk-delay", type=float, default=0.0)
+    return parser.parse_args()
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    args = parse_args()
+    behavior = MockBehavior(
+        latency_seconds=tuple(args.latency),
+        rate_limit_rate=args.rate_limit_rate,
+        forbidden_rate=args.forbidden_rate,
+        unavailable_rate=args.unavailable_rate,
+        retry_after_seconds=args.retry_after,
+        chunk_delay_seconds=args.chunk_delay,
+    )
+    servers = start_mock_servers(behavior)
+    for provider_key, server in servers.items():
+        logging.info("%s: %s", provider_key, server.url_for(1))
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for server in servers.values():
+            server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,9 @@ from dataclasses import dataclass
 from datetime import datetime
 from typing import Any
 
+from .config import PARSER_VERSION
+from .utils import get_domain
+
 
 @dataclass
 class Offer:
@@ -47,6 +50,12 @@ class ProviderParseResult:
     raw_offer_texts: list[str]
     error_message: str | None = None
     http_status: int | None = None
+    etag: str | None = None
+    last_modified: str | None = None
+    fingerprint: str | None = None
+    not_modified: bool = False
+    # Set when the result is written for a task; keys the run ledger.
+    place_id: str | None = None
 
     def to_firestore(self) -> dict[str, Any]:
         return {
@@ -54,8 +63,27 @@ class ProviderParseResult:
             "fetchedAt": self.fetched_at,
             "status": self.status,
             "stale": self.status != "ok",
-            "parserVersion": "0.1.0",
+            "parserVersion": PARSER_VERSION,
             "offers": [offer.to_dict() for offer in self.offers],
             "rawOfferTexts": self.raw_offer_texts,
             "errorMessage": self.error_message,
         }
+
+
+@dataclass
+class ScrapeTask:
+    place_id: str
+    provider_key: str
+    url: str
+    existing_provider: dict[str, Any] | None = None
+    revalidate: bool = True
+    # Higher runs first; see priority.task_value.
+    value: float = 0.0
+    # Retries already used for this task in the current run.
+    attempt: int = 0
+    # 403/429 responses this task has had in the current run.
+    rejections: int = 0
+
+    @property
+    def domain(self) -> str:
+        return get_domain(self.url)
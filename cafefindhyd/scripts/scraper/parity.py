@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+from bs4 import BeautifulSoup
+
+from .config import FIXTURES_DIR
+from .normalization import extract_offer_texts
+from .providers.backends import available_backends
+from .providers.swiggy_dineout import (
+    SwiggyDineoutParser,
+    _extract_offer_texts_from_next_data,
+)
+from .providers.zomato import ZomatoParser, _extract_offer_cards
+
+
+PARSERS = {
+    "zomato": ZomatoParser,
+    "swiggy_dineout": SwiggyDineoutParser,
+}
+
+
+def main() -> None:
+    args = parse_args()
+    fixtures_dir = Path(args.fixtures)
+    backends = available_backends()
+    print(f"backends: {', '.join(backends)}")
+
+    checked = 0
+    mismatches = 0
+    for provider_key, parser_cls in PARSERS.items():
+        for path in sorted((fixtures_dir / provider_key).glob("*.html")):
+            html = path.read_text(encoding="utf-8")
+            expected = reference_offer_texts(provider_key, html)
+            for backend in backends:
+                result = parser_cls(backend=backend).parse(html, str(path))
+                checked += 1
+                if result.raw_offer_texts == expected:
+                    continue
+                mismatches += 1
+                print(f"MISMATCH {provider_key}/{path.name} [{backend}]")
+                print(f"  expected: {expected}")
+                print(f"  actual:   {result.raw_offer_texts}")
+
+    print(f"checked {checked} fixture/backend pairs, {mismatches} mismatches")
+    if mismatches or not checked:
+        sys.exit(1)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Check parser backends against the html.parser extraction"
+    )
+    parser.add_argument(
+        "--fixtures",
+        default=str(FIXTURES_DIR),
+        help="Fixture directory with one sub-directory per provider",
+    )
+    return parser.parse_args()
+
+
+def reference_offer_texts(provider_key: str, html: str) -> list[str]:
+    """Offer texts as extracted by a full html.parser tree (the original path)."""
+    soup = BeautifulSoup(html, "html.parser")
+    if provider_key == "zomato":
+        raw_texts = _extract_offer_cards(soup)
+    else:
+        raw_texts = _extract_offer_texts_from_next_data(soup)
+    if not raw_texts:
+        raw_texts = extract_offer_texts([text for text in soup.stripped_strings])
+    return raw_texts
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import math
+from datetime import datetime, timezone
+from typing import Any
+
+from .config import DEFAULT_PLACE_RANK, FAILURE_PENALTY, MAX_OVERDUE_RATIO
+from .refresh import refresh_hours_for
+from .utils import now_utc
+
+
+def overdue_ratio(
+    existing_provider: dict[str, Any] | None, refresh_hours: int
+) -> float:
+    """Age of the stored offers in (learned) refresh intervals, capped.
+
+    Never-fetched providers get the cap.
+    """
+    fetched_at = (existing_provider or {}).get("fetchedAt")
+    if not isinstance(fetched_at, datetime):
+        return MAX_OVERDUE_RATIO
+    if fetched_at.tzinfo is None:
+        fetched_at = fetched_at.replace(tzinfo=timezone.utc)
+    age_hours = (now_utc() - fetched_at).total_seconds() / 3600
+    interval = refresh_hours_for(existing_provider, refresh_hours)
+    return min(max(age_hours / max(interval, 1), 0.0), MAX_OVERDUE_RATIO)
+
+
+def rank_weight(rank: Any) -> float:
+    """1.0 for the top place, falling off logarithmically with rank."""
+    try:
+        rank = int(rank)
+    except (TypeError, ValueError):
+        rank = DEFAULT_PLACE_RANK
+    return 1 / math.log2(max(rank, 1) + 1)
+
+
+def failure_weight(existing_provider: dict[str, Any] | None) -> float:
+    """Halve the priority for each consecutive failed fetch (up to 5)."""
+    try:
+        failures = int((existing_provider or {}).get("consecutiveFailures") or 0)
+    except (TypeError, ValueError):
+        failures = 0
+    return FAILURE_PENALTY ** min(max(failures, 0), 5)
+
+
+def task_value(
+    place: dict[str, Any],
+    existing_provider: dict[str, Any] | None,
+    refresh_hours: int,
+) -> float:
+    """Scheduling priority: overdue ratio x rank weight x failure weight."""
+    return (
+        overdue_ratio(existing_provider, refresh_hours)
+        * rank_weight(place.get("rank", place.get("Rank")))
+        * failure_weight(existing_provider)
+    )
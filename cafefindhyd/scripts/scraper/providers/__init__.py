@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from ..models import ProviderParseResult
 from .eazydiner import EazydinerParser
 from .swiggy_dineout import SwiggyDineoutParser
 from .zomato import ZomatoParser
@@ -12,3 +13,11 @@ def get_parser(provider_key: str):
         "eazydiner": EazydinerParser(),
     }
     return registry.get(provider_key)
+
+
+def parse_page(provider_key: str, html: str, source_url: str) -> ProviderParseResult:
+    """Module-level parse entry point, picklable for the parse process pool."""
+    parser = get_parser(provider_key)
+    if parser is None:
+        raise ValueError(f"No parser registered for {provider_key}")
+    return parser.parse(html, source_url)
@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+import importlib.util
+import os
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+from ..config import HTML_PARSER_BACKEND
+
+
+# Fastest first; "html.parser" is pure Python and always available.
+_BACKEND_PREFERENCE = ("lxml", "html.parser")
+
+
+def available_backends() -> list[str]:
+    return [backend for backend in _BACKEND_PREFERENCE if _is_installed(backend)]
+
+
+def resolve_backend(backend: str | None = None) -> str:
+    """Pick the BeautifulSoup tree builder to use.
+
+    ``backend`` (or the ``SCRAPER_HTML_PARSER`` env var, or the config
+    default) may name a specific builder or be "auto" for the fastest one
+    installed. Unknown or missing builders fall back to "html.parser".
+    """
+    requested = backend or os.getenv("SCRAPER_HTML_PARSER") or HTML_PARSER_BACKEND
+    if requested == "auto":
+        return available_backends()[0]
+    if requested in _BACKEND_PREFERENCE and _is_installed(requested):
+        return requested
+    return "html.parser"
+
+
+def make_soup(
+    html: str,
+    backend: str | None = None,
+    parse_only: SoupStrainer | None = None,
+) -> BeautifulSoup:
+    return BeautifulSoup(html, resolve_backend(backend), parse_only=parse_only)
+
+
+def _is_installed(backend: str) -> bool:
+    if backend == "html.parser":
+        return True
+    return importlib.util.find_spec(backend) is not None
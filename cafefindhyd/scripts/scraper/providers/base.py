@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import hashlib
 from dataclasses import dataclass
 from datetime import datetime
 from typing import Protocol
@@ -9,9 +10,19 @@ from ..models import Offer, ProviderParseResult
 
 class ProviderParser(Protocol):
     key: str
+    # CPU-bound parsers run in the parse process pool when one is configured.
+    cpu_bound: bool
 
     def parse(self, html: str, source_url: str) -> ProviderParseResult: ...
 
+    def fingerprint(self, html: str) -> str | None:
+        """Cheap hash of the offer-bearing part of the page, without parsing.
+
+        Returns None when the provider has no stable region to fingerprint,
+        in which case the page is always parsed.
+        """
+        ...
+
 
 @dataclass
 class ParserContext:
@@ -36,3 +47,27 @@ def build_result(
         raw_offer_texts=raw_offer_texts,
         error_message=error_message,
     )
+
+
+def fingerprint_text(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8", errors="replace")).hexdigest()
+
+
+def find_script_payload(html: str, script_id: str) -> str | None:
+    """Slice the body of ``<script id="...">`` straight from the raw HTML."""
+    for quote in ('"', "'"):
+        marker = html.find(f"id={quote}{script_id}{quote}")
+        if marker != -1:
+            break
+    else:
+        return None
+    tag_start = html.rfind("<script", 0, marker)
+    if tag_start == -1 or html.find(">", tag_start, marker) != -1:
+        return None
+    body_start = html.find(">", marker)
+    if body_start == -1:
+        return None
+    body_end = html.find("</script>", body_start)
+    if body_end == -1:
+        return None
+    return html[body_start + 1 : body_end]
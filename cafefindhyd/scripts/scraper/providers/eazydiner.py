@@ -1,14 +1,16 @@
 from __future__ import annotations
 
+import json
 import re
 from datetime import datetime, timezone
+from typing import Callable
 from urllib.parse import urlparse
 
 import requests
 
-from ..config import REQUEST_TIMEOUT_SECONDS, USER_AGENT
 from ..models import ProviderParseResult
 from ..normalization import normalize_offer_text
+from ..sessions import http_get
 from .base import build_result
 
 
@@ -17,6 +19,15 @@ _BUILD_ID_RE = re.compile(r"/_next/static/([^/]+)/_buildManifest\.js")
 
 class EazydinerParser:
     key = "eazydiner"
+    # The work here is the follow-up JSON request, so it stays in the fetch
+    # thread instead of shipping the page to the parse pool.
+    cpu_bound = False
+
+    def __init__(
+        self, fetch_data: Callable[[str], tuple[int, str]] | None = None
+    ) -> None:
+        # Fetches the /_next/data payload; replaced to archive or replay it.
+        self.fetch_data = fetch_data or fetch_data_payload
 
     def parse(self, html: str, source_url: str) -> ProviderParseResult:
         fetched_at = datetime.now(timezone.utc)
@@ -45,12 +56,8 @@ class EazydinerParser:
             )
 
         try:
-            response = requests.get(
-                data_url,
-                headers={"User-Agent": USER_AGENT},
-                timeout=REQUEST_TIMEOUT_SECONDS,
-            )
-        except requests.RequestException as exc:
+            status_code, body = self.fetch_data(data_url)
+        except (requests.RequestException, LookupError) as exc:
             return build_result(
                 self.key,
                 source_url,
@@ -61,7 +68,7 @@ class EazydinerParser:
                 error_message=str(exc),
             )
 
-        if response.status_code >= 400:
+        if status_code >= 400:
             return build_result(
                 self.key,
                 source_url,
@@ -69,11 +76,11 @@ class EazydinerParser:
                 offers=[],
                 raw_offer_texts=[],
                 status="error",
-                error_message=f"HTTP {response.status_code}",
+                error_message=f"HTTP {status_code}",
             )
 
         try:
-            data = response.json()
+            data = json.loads(body)
         except ValueError:
             return build_result(
                 self.key,
@@ -109,6 +116,15 @@ class EazydinerParser:
             raw_offer_texts=raw_texts,
         )
 
+    def fingerprint(self, html: str) -> str | None:
+        # Offers come from the separate /_next/data payload, not this page.
+        return None
+
+
+def fetch_data_payload(data_url: str) -> tuple[int, str]:
+    response = http_get(data_url)
+    return response.status_code, response.text
+
 
 def _extract_build_id(html: str) -> str | None:
     match = _BUILD_ID_RE.search(html)
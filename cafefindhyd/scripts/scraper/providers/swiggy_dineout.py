@@ -7,18 +7,28 @@ from bs4 import BeautifulSoup
 
 from ..models import ProviderParseResult
 from ..normalization import extract_offer_texts, normalize_offer_text
-from .base import build_result
+from .backends import make_soup
+from .base import build_result, find_script_payload, fingerprint_text
 
 
 class SwiggyDineoutParser:
     key = "swiggy_dineout"
+    cpu_bound = True
+
+    def __init__(self, backend: str | None = None) -> None:
+        self.backend = backend
 
     def parse(self, html: str, source_url: str) -> ProviderParseResult:
-        soup = BeautifulSoup(html, "html.parser")
-        raw_texts = _extract_offer_texts_from_next_data(soup)
+        # Fast path: slice the __NEXT_DATA__ payload out of the raw text so
+        # the (very large) page never gets a DOM built for it.
+        raw_texts = _extract_offer_texts_from_raw_next_data(html)
         if not raw_texts:
-            texts = [text for text in soup.stripped_strings]
-            raw_texts = extract_offer_texts(texts)
+            soup = make_soup(html, self.backend)
+            if raw_texts is None:
+                raw_texts = _extract_offer_texts_from_next_data(soup)
+            if not raw_texts:
+                texts = [text for text in soup.stripped_strings]
+                raw_texts = extract_offer_texts(texts)
         offers = [
             normalize_offer_text(text, self.key, source_url) for text in raw_texts
         ]
@@ -43,6 +53,26 @@ class SwiggyDineoutParser:
             raw_offer_texts=raw_texts,
         )
 
+    def fingerprint(self, html: str) -> str | None:
+        payload = find_script_payload(html, "__NEXT_DATA__")
+        if not payload:
+            return None
+        return fingerprint_text(payload.strip())
+
+
+def _extract_offer_texts_from_raw_next_data(html: str) -> list[str] | None:
+    """Offer texts from the sliced payload, or None if it could not be read."""
+    payload = find_script_payload(html, "__NEXT_DATA__")
+    if not payload:
+        return None
+    try:
+        data = json.loads(payload)
+    except json.JSONDecodeError:
+        return None
+    if not isinstance(data, dict):
+        return None
+    return _extract_offer_texts_from_data(data)
+
 
 def _extract_offer_texts_from_next_data(soup: BeautifulSoup) -> list[str]:
     next_data = soup.find("script", id="__NEXT_DATA__")
@@ -52,7 +82,12 @@ def _extract_offer_texts_from_next_data(soup: BeautifulSoup) -> list[str]:
         data = json.loads(next_data.string)
     except json.JSONDecodeError:
         return []
+    if not isinstance(data, dict):
+        return []
+    return _extract_offer_texts_from_data(data)
+
 
+def _extract_offer_texts_from_data(data: dict) -> list[str]:
     cards = (
         data.get("props", {})
         .get("pageProps", {})
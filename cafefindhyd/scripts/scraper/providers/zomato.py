@@ -2,20 +2,45 @@ from __future__ import annotations
 
 from datetime import datetime, timezone
 
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 
 from ..models import ProviderParseResult
 from ..normalization import extract_offer_texts, normalize_offer_text
-from .base import build_result
+from .backends import make_soup
+from .base import build_result, fingerprint_text
+
+
+# Characters kept after the last ".offer-card" marker so the final card's
+# title/description are covered by the fingerprint.
+_OFFER_REGION_TAIL = 2048
+
+
+def _has_offer_card_class(value) -> bool:
+    # While straining, the class attribute may still be the raw string.
+    if not value:
+        return False
+    classes = value.split() if isinstance(value, str) else value
+    return "offer-card" in classes
+
+
+# Only .offer-card elements (and their descendants) are built into the tree.
+_OFFER_CARD_STRAINER = SoupStrainer(class_=_has_offer_card_class)
 
 
 class ZomatoParser:
     key = "zomato"
+    cpu_bound = True
+
+    def __init__(self, backend: str | None = None) -> None:
+        self.backend = backend
 
     def parse(self, html: str, source_url: str) -> ProviderParseResult:
-        soup = BeautifulSoup(html, "html.parser")
-        raw_texts = _extract_offer_cards(soup)
+        raw_texts: list[str] = []
+        if "offer-card" in html:
+            cards = make_soup(html, self.backend, parse_only=_OFFER_CARD_STRAINER)
+            raw_texts = _extract_offer_cards(cards)
         if not raw_texts:
+            soup = make_soup(html, self.backend)
             texts = [text for text in soup.stripped_strings]
             raw_texts = extract_offer_texts(texts)
         offers = [
@@ -42,6 +67,15 @@ class ZomatoParser:
             raw_offer_texts=raw_texts,
         )
 
+    def fingerprint(self, html: str) -> str | None:
+        first = html.find("offer-card")
+        if first == -1:
+            return None
+        last = html.rfind("offer-card")
+        start = html.rfind("<", 0, first)
+        region = html[max(start, 0) : last + _OFFER_REGION_TAIL]
+        return fingerprint_text(" ".join(region.split()))
+
 
 def _extract_offer_cards(soup: BeautifulSoup) -> list[str]:
     raw_texts: list[str] = []
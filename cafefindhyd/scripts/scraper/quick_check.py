@@ -5,8 +5,8 @@ import sys
 
 import requests
 
-from .config import REQUEST_TIMEOUT_SECONDS, USER_AGENT
 from .providers import get_parser
+from .sessions import http_get
 
 
 DEFAULT_PAIRS = [
@@ -61,11 +61,7 @@ def split_pair(pair: str) -> tuple[str, str]:
 
 
 def fetch_html(url: str) -> str:
-    response = requests.get(
-        url,
-        headers={"User-Agent": USER_AGENT},
-        timeout=REQUEST_TIMEOUT_SECONDS,
-    )
+    response = http_get(url)
     response.raise_for_status()
     return response.text
 
@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import math
+from datetime import datetime, timedelta
+from typing import Any
+
+from .config import (
+    CHANGE_HISTORY_MIN_FETCHES,
+    CHANGE_HISTORY_SIZE,
+    REFRESH_MAX_GROWTH,
+    REFRESH_MAX_HOURS,
+    REFRESH_MIN_HOURS,
+)
+from .utils import as_utc
+
+
+def record_fetch(
+    existing_provider: dict[str, Any] | None, fetched_at: datetime, changed: bool
+) -> list[dict[str, Any]]:
+    """Append a successful fetch to the provider's bounded change history."""
+    history = list((existing_provider or {}).get("changeHistory") or [])
+    history.append({"at": fetched_at, "changed": changed})
+    return history[-CHANGE_HISTORY_SIZE:]
+
+
+def adaptive_refresh_hours(
+    history: list[dict[str, Any]],
+    base_hours: float,
+    previous_hours: float | None = None,
+) -> float:
+    """Refresh interval matching the page's observed rate of offer changes.
+
+    Uses the change-rate estimator for periodic polling (Cho & Garcia-Molina):
+    with ``n`` intervals of mean length ``I`` of which ``x`` saw a change,
+    ``rate = -ln((n - x + 0.5) / (n + 0.5)) / I``. The interval is the mean
+    time between changes, clamped to the configured bounds. Relative to the
+    previous interval it may grow at most ``REFRESH_MAX_GROWTH`` times, and
+    shrinks by that factor at least when the latest fetch saw a change (the
+    estimator cannot see changes faster than the polling rate). Until enough
+    fetches are recorded the provider's fixed interval is used.
+    """
+    times = [as_utc(entry.get("at")) for entry in history]
+    if len(history) < CHANGE_HISTORY_MIN_FETCHES or None in times:
+        return base_hours
+    # The first entry only anchors the first interval.
+    intervals = len(history) - 1
+    span_hours = (times[-1] - times[0]).total_seconds() / 3600
+    if span_hours <= 0:
+        return base_hours
+    changes = sum(1 for entry in history[1:] if entry.get("changed"))
+    rate = -math.log((intervals - changes + 0.5) / (intervals + 0.5)) / (
+        span_hours / intervals
+    )
+    hours = 1 / rate if rate > 0 else REFRESH_MAX_HOURS
+    if previous_hours:
+        hours = min(hours, previous_hours * REFRESH_MAX_GROWTH)
+        if history[-1].get("changed"):
+            hours = min(hours, previous_hours / REFRESH_MAX_GROWTH)
+    return min(max(hours, REFRESH_MIN_HOURS), REFRESH_MAX_HOURS)
+
+
+def refresh_hours_for(
+    existing_provider: dict[str, Any] | None, base_hours: float
+) -> float:
+    learned = (existing_provider or {}).get("refreshHours")
+    if isinstance(learned, (int, float)) and learned > 0:
+        return float(learned)
+    return base_hours
+
+
+def refresh_fields(
+    existing_provider: dict[str, Any] | None,
+    base_hours: float,
+    fetched_at: datetime,
+    changed: bool | None,
+) -> dict[str, Any]:
+    """placeOffers fields scheduling the next fetch; ``changed=None`` = failed.
+
+    A failed fetch keeps the learned interval and history but is retried no
+    later than the provider's fixed interval.
+    """
+    if changed is None:
+        hours = min(refresh_hours_for(existing_provider, base_hours), base_hours)
+        return {"nextDueAt": fetched_at + timedelta(hours=hours)}
+    history = record_fetch(existing_provider, fetched_at, changed)
+    hours = adaptive_refresh_hours(
+        history, base_hours, refresh_hours_for(existing_provider, base_hours)
+    )
+    return {
+        "changeHistory": history,
+        "refreshHours": round(hours, 2),
+        "nextDueAt": fetched_at + timedelta(hours=hours),
+    }
+
+
+def is_due(
+    existing_provider: dict[str, Any] | None, base_hours: float, now: datetime
+) -> bool:
+    next_due = as_utc((existing_provider or {}).get("nextDueAt"))
+    if next_due is not None:
+        return now >= next_due
+    fetched_at = as_utc((existing_provider or {}).get("fetchedAt"))
+    if fetched_at is None:
+        return True
+    return now - fetched_at > timedelta(hours=base_hours)
@@ -0,0 +1,195 @@
+from __future__ import annotations
+
+import argparse
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import timedelta
+from typing import Any
+
+from .archive import ArchiveEntry, PageArchive
+from .config import PARSE_WORKERS, PARSER_VERSION
+from .firestore_client import add_storage_arguments, storage_from_args
+from .models import ProviderParseResult
+from .providers import get_parser, parse_page
+from .scraper import load_place_offers_bulk
+from .utils import as_utc, hash_offers
+from .writer import PlaceOffersWriter
+
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+# A page is archived just before it is parsed, so the fetch that stored the
+# offers may be timestamped a little later than its own archive entry.
+_SAME_FETCH_SLACK = timedelta(minutes=30)
+
+
+def main() -> None:
+    args = parse_args()
+    archive = PageArchive(args.archive_dir)
+    entries = [
+        entry
+        for entry in archive.latest_entries("page")
+        if (not args.place_id or entry.place_id in args.place_id)
+        and (not args.provider or entry.provider_key in args.provider)
+    ]
+
+    firestore = storage_from_args(args)
+    place_offers = load_place_offers_bulk(
+        firestore, sorted({entry.place_id for entry in entries})
+    )
+    # A page archived before the last live fetch must not replace its offers.
+    current = [entry for entry in entries if not is_outdated(entry, place_offers)]
+    counts = {
+        "changed": 0,
+        "unchanged": 0,
+        "failed": 0,
+        "outdated": len(entries) - len(current),
+    }
+    entries = current
+    logging.info("Re-parsing %s archived pages", len(entries))
+    with PlaceOffersWriter(firestore) as writer, ProcessPoolExecutor(
+        max_workers=max(args.workers, 1),
+        mp_context=multiprocessing.get_context("spawn"),
+    ) as parse_pool, ThreadPoolExecutor(max_workers=max(args.workers, 1)) as threads:
+        results = threads.map(
+            lambda entry: (entry, reparse_or_fail(archive, parse_pool, entry)),
+            entries,
+        )
+        for entry, result in results:
+            if result.status != "ok" or not result.offers:
+                counts["failed"] += 1
+                logging.warning(
+                    "%s/%s: %s (%s)",
+                    entry.place_id,
+                    entry.provider_key,
+                    result.status,
+                    result.error_message,
+                )
+                continue
+            providers = (place_offers.get(entry.place_id) or {}).get("providers") or {}
+            existing_hash = (providers.get(entry.provider_key) or {}).get("hash")
+            update = build_reparse_update(result)
+            if update["hash"] == existing_hash:
+                counts["unchanged"] += 1
+                continue
+            counts["changed"] += 1
+            if args.dry_run:
+                logging.info(
+                    "[dry-run] %s/%s -> %s offers",
+                    entry.place_id,
+                    entry.provider_key,
+                    len(update["offers"]),
+                )
+            else:
+                writer.submit(entry.place_id, entry.provider_key, update)
+
+    archive.close()
+    logging.info("Re-parse complete (parser %s): %s", PARSER_VERSION, counts)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Re-run the current parsers over archived pages (no site access)"
+    )
+    parser.add_argument(
+        "--archive-dir",
+        required=True,
+        help="Archive directory written by the scraper's --archive-dir",
+    )
+    add_storage_arguments(parser)
+    parser.add_argument(
+        "--place-id",
+        action="append",
+        help="Restrict to a specific placeId (repeatable)",
+    )
+    parser.add_argument(
+        "--provider",
+        action="append",
+        help="Restrict to a provider key (repeatable)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=PARSE_WORKERS,
+        help="Parse processes",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Log changed documents without writing",
+    )
+    return parser.parse_args()
+
+
+def is_outdated(
+    entry: ArchiveEntry, place_offers: dict[str, dict[str, Any]]
+) -> bool:
+    """Whether the stored offers come from a page newer than the archived one.
+
+    With a change history, only fetches that changed the offers count, so a
+    page stays current through later 304s and unchanged refreshes.
+    """
+    providers = (place_offers.get(entry.place_id) or {}).get("providers") or {}
+    stored = providers.get(entry.provider_key) or {}
+    history = stored.get("changeHistory")
+    if history:
+        times = [item.get("at") for item in history if item.get("changed")]
+    else:
+        times = [stored.get("fetchedAt")]
+    times = [value for value in map(as_utc, times) if value is not None]
+    if not times:
+        return False
+    return as_utc(entry.fetched_at) + _SAME_FETCH_SLACK < max(times)
+
+
+def reparse_or_fail(
+    archive: PageArchive, parse_pool: ProcessPoolExecutor, entry: ArchiveEntry
+) -> ProviderParseResult:
+    """Re-parse one page; an error comes back as a failed result, not raised."""
+    try:
+        return reparse_entry(archive, parse_pool, entry)
+    except Exception as exc:
+        return ProviderParseResult(
+            provider_key=entry.provider_key,
+            source_url=entry.url,
+            status="error",
+            fetched_at=entry.fetched_at,
+            offers=[],
+            raw_offer_texts=[],
+            error_message=str(exc) or exc.__class__.__name__,
+        )
+
+
+def reparse_entry(
+    archive: PageArchive, parse_pool: ProcessPoolExecutor, entry: ArchiveEntry
+) -> ProviderParseResult:
+    html = archive.read(entry.digest)
+    parser = get_parser(entry.provider_key)
+    if parser is None:
+        raise ValueError(f"No parser registered for {entry.provider_key}")
+    if parser.cpu_bound:
+        return parse_pool.submit(parse_page, entry.provider_key, html, entry.url).result()
+    if hasattr(parser, "fetch_data"):
+        # Replay follow-up requests (EazyDiner's data payload) from the archive.
+        parser.fetch_data = lambda url: (200, archive.latest_body(url))
+    return parser.parse(html, entry.url)
+
+
+def build_reparse_update(result: ProviderParseResult) -> dict[str, Any]:
+    offer_dicts = [offer.to_dict() for offer in result.offers]
+    update: dict[str, Any] = {
+        "status": "ok",
+        "stale": False,
+        "errorMessage": None,
+        "parserVersion": PARSER_VERSION,
+        "hash": hash_offers(offer_dicts),
+        "offers": offer_dicts,
+    }
+    if result.raw_offer_texts:
+        update["rawOfferTexts"] = result.raw_offer_texts
+    return update
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import random
+from dataclasses import dataclass, replace
+
+from .config import (
+    RETRY_BASE_SECONDS,
+    RETRY_MAX_ATTEMPTS,
+    RETRY_MAX_SECONDS,
+    RETRY_STATUS_CODES,
+)
+from .models import ScrapeTask
+from .scheduler import Requeue
+
+
+@dataclass
+class RetryPolicy:
+    """How often and how soon a transiently failed task is fetched again.
+
+    Retries wait ``uniform(0, base * 2**attempt)`` seconds (full jitter,
+    capped at ``max_seconds``) and then queue for their domain like any other
+    task, so the throttle and circuit breaker still apply. With
+    ``hedge_percentile`` the async engine sends a second copy of a request
+    that is slower than that percentile of its domain, if the domain has a
+    free slot.
+    """
+
+    max_attempts: int = RETRY_MAX_ATTEMPTS
+    base_seconds: float = RETRY_BASE_SECONDS
+    max_seconds: float = RETRY_MAX_SECONDS
+    hedge_percentile: float | None = None
+
+    def backoff_seconds(self, attempt: int) -> float:
+        ceiling = min(self.max_seconds, self.base_seconds * 2**attempt)
+        return random.uniform(0, ceiling)
+
+    def requeue(self, task: ScrapeTask) -> Requeue | None:
+        """A delayed Requeue for the next attempt, or None once exhausted."""
+        if task.attempt + 1 >= self.max_attempts:
+            return None
+        return Requeue(
+            replace(task, attempt=task.attempt + 1),
+            task.value,
+            self.backoff_seconds(task.attempt),
+        )
+
+
+def is_retryable_status(status_code: int) -> bool:
+    return status_code in RETRY_STATUS_CODES
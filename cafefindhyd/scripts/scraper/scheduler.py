@@ -0,0 +1,252 @@
+from __future__ import annotations
+
+import heapq
+import itertools
+import logging
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Callable, Iterator
+
+from .budget import TimeBudget
+from .config import (
+    BREAKER_MAX_WAIT_SECONDS,
+    GLOBAL_CONCURRENCY,
+    QUEUE_REPORT_INTERVAL_SECONDS,
+)
+from .metrics import RunMetrics
+from .throttling import DomainThrottle, Slot
+from .utils import abandon_on_error
+
+
+@dataclass
+class Requeue:
+    """Handler result asking for ``task`` to be queued again, not yielded.
+
+    ``delay`` keeps it out of the queue for that many seconds (retry backoff).
+    """
+
+    task: Any
+    priority: float = 0.0
+    delay: float = 0.0
+
+
+class DomainScheduler:
+    """Dispatches tasks from per-domain priority queues as domains become free.
+
+    Workers are only handed a task once ``DomainThrottle`` has granted its
+    domain a slot, so no worker sits idle waiting on a busy domain. Each
+    domain serves its highest-priority task first; among domains that are
+    ready at the same time, the one with the higher-priority head goes
+    first, ties round-robin. The handler gets the task and its ``Slot``, and
+    must release the slot. Tasks with an empty domain (invalid URLs)
+    bypass the throttle and get no slot. With a ``TimeBudget``,
+    a domain whose next task cannot finish before the deadline has its
+    remaining queue deferred; so does a domain whose circuit breaker stays
+    open longer than ``max_breaker_wait`` seconds. Handlers return
+    ``Requeue`` to put a task back on its domain's queue, after its delay.
+    With ``metrics``, each task's ``throttleWait`` is recorded: the time from
+    becoming the head of its domain's queue to being dispatched.
+    """
+
+    def __init__(
+        self,
+        throttle: DomainThrottle,
+        max_workers: int = GLOBAL_CONCURRENCY,
+        report_interval: float = QUEUE_REPORT_INTERVAL_SECONDS,
+        budget: TimeBudget | None = None,
+        max_breaker_wait: float = BREAKER_MAX_WAIT_SECONDS,
+        metrics: RunMetrics | None = None,
+    ) -> None:
+        self._throttle = throttle
+        self._metrics = metrics
+        self._budget = budget
+        self._max_breaker_wait = max_breaker_wait
+        self._max_workers = max_workers
+        self._report_interval = report_interval
+        # Heaps of (-priority, insertion order, task) per domain.
+        self._queues: dict[str, list[tuple[float, int, Any]]] = {}
+        self._sequence = itertools.count()
+        # Heap of (monotonic due time, order, domain, priority, task).
+        self._delayed: list[tuple[float, int, str, float, Any]] = []
+        self._order: list[str] = []
+        # When each domain's current head task reached the front.
+        self._head_since: dict[str, float] = {}
+        self.busy_seconds = 0.0
+        self.elapsed_seconds = 0.0
+        self.deferred: list[Any] = []
+
+    def add(self, domain: str, task: Any, priority: float = 0.0) -> None:
+        if domain not in self._queues:
+            self._queues[domain] = []
+            self._order.append(domain)
+        if not self._queues[domain]:
+            self._head_since[domain] = time.monotonic()
+        heapq.heappush(self._queues[domain], (-priority, next(self._sequence), task))
+
+    def add_later(
+        self, delay: float, domain: str, task: Any, priority: float = 0.0
+    ) -> None:
+        due = time.monotonic() + delay
+        heapq.heappush(
+            self._delayed, (due, next(self._sequence), domain, priority, task)
+        )
+
+    def queue_depths(self) -> dict[str, int]:
+        return {domain: len(queue) for domain, queue in self._queues.items() if queue}
+
+    def utilization(self) -> float:
+        if not self.elapsed_seconds:
+            return 0.0
+        return self.busy_seconds / (self.elapsed_seconds * self._max_workers)
+
+    def run(
+        self,
+        handler: Callable[[Any, Slot | None], Any],
+        stop: threading.Event | None = None,
+    ) -> Iterator[Any]:
+        """Yield handler results; once ``stop`` is set, only drain in flight."""
+        stop = stop or threading.Event()
+        started = time.monotonic()
+        last_report = started
+        in_flight: set[Future] = set()
+
+        def timed(
+            domain: str, task: Any, slot: Slot | None
+        ) -> tuple[str, Any, float]:
+            task_started = time.monotonic()
+            result = handler(task, slot)
+            busy = time.monotonic() - task_started
+            if self._budget is not None and domain:
+                self._budget.observe(domain, busy)
+            return domain, result, busy
+
+        with abandon_on_error(
+            ThreadPoolExecutor(max_workers=self._max_workers)
+        ) as executor:
+            while in_flight or (
+                (self.queue_depths() or self._delayed) and not stop.is_set()
+            ):
+                self._release_delayed()
+                while len(in_flight) < self._max_workers and not stop.is_set():
+                    ready = self._next_ready_domain()
+                    if ready is None:
+                        break
+                    domain, slot = ready
+                    task = self._pop(domain)
+                    in_flight.add(executor.submit(timed, domain, task, slot))
+
+                timeout = self._seconds_until_next_ready()
+                if in_flight:
+                    done, in_flight = wait(
+                        in_flight, timeout=timeout, return_when=FIRST_COMPLETED
+                    )
+                    for future in done:
+                        domain, result, busy = future.result()
+                        self.busy_seconds += busy
+                        if isinstance(result, Requeue):
+                            self.add_later(
+                                result.delay, domain, result.task, result.priority
+                            )
+                            continue
+                        yield result
+                elif timeout:
+                    stop.wait(timeout)
+
+                if time.monotonic() - last_report >= self._report_interval:
+                    last_report = time.monotonic()
+                    logging.info(
+                        "Queue depth: %s (in flight: %s)",
+                        _format_depths(self.queue_depths()),
+                        len(in_flight),
+                    )
+
+        self.elapsed_seconds = time.monotonic() - started
+
+    def _pop(self, domain: str) -> Any:
+        queue = self._queues[domain]
+        task = heapq.heappop(queue)[2]
+        now = time.monotonic()
+        if self._metrics is not None:
+            self._metrics.observe(
+                "throttleWait",
+                (now - self._head_since[domain]) * 1000,
+                getattr(task, "provider_key", None),
+                domain or None,
+            )
+        self._head_since[domain] = now
+        return task
+
+    def _next_ready_domain(self) -> tuple[str, Slot | None] | None:
+        now = time.monotonic()
+        candidates = [domain for domain in self._order if self._queues[domain]]
+        # Stable sort: equal keys keep the round-robin order of _order.
+        candidates.sort(
+            key=lambda domain: (
+                max(self._ready_at(domain), now),
+                self._queues[domain][0][0],
+            )
+        )
+        for domain in candidates:
+            if domain and self._should_defer(domain):
+                continue
+            slot = self._throttle.try_acquire(domain) if domain else None
+            if domain and slot is None:
+                continue
+            self._order.remove(domain)
+            self._order.append(domain)
+            return domain, slot
+        return None
+
+    def _should_defer(self, domain: str) -> bool:
+        """Defer the domain's whole queue if its next task cannot run in time."""
+        open_seconds = self._throttle.open_seconds(domain)
+        if open_seconds > self._max_breaker_wait:
+            reason = f"circuit open for another {open_seconds:.0f}s"
+        elif self._budget is not None and not self._budget.admits(
+            domain, starts_in=open_seconds
+        ):
+            reason = (
+                f"~{self._budget.task_seconds(domain):.1f}s per task, "
+                f"{self._budget.remaining_seconds():.0f}s left"
+            )
+        else:
+            return False
+
+        queue = self._queues[domain]
+        logging.warning("Deferring %s tasks for %s (%s)", len(queue), domain, reason)
+        if self._budget is not None:
+            self._budget.defer(len(queue))
+        self.deferred.extend(entry[2] for entry in sorted(queue))
+        queue.clear()
+        return True
+
+    def _release_delayed(self) -> None:
+        now = time.monotonic()
+        while self._delayed and self._delayed[0][0] <= now:
+            _, _, domain, priority, task = heapq.heappop(self._delayed)
+            self.add(domain, task, priority)
+
+    def _seconds_until_next_ready(self) -> float | None:
+        ready_times = [
+            self._ready_at(domain)
+            for domain, queue in self._queues.items()
+            if queue
+        ]
+        if self._delayed:
+            ready_times.append(self._delayed[0][0])
+        if not ready_times or min(ready_times) == float("inf"):
+            return None
+        return max(0.0, min(ready_times) - time.monotonic())
+
+    def _ready_at(self, domain: str) -> float:
+        if not domain:
+            return 0.0
+        return self._throttle.ready_at(domain)
+
+
+def _format_depths(depths: dict[str, int]) -> str:
+    if not depths:
+        return "empty"
+    return ", ".join(f"{domain or '<invalid>'}={depth}" for domain, depth in depths.items())
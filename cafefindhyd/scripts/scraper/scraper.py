@@ -2,25 +2,64 @@ from __future__ import annotations
 
 import argparse
 import logging
+import multiprocessing
 import re
+import signal
+import threading
 import uuid
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from datetime import datetime, timedelta, timezone
-from typing import Any
-
-import requests
-
+from concurrent.futures import (
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    as_completed,
+)
+from contextlib import contextmanager, nullcontext
+from datetime import datetime, timezone
+from itertools import islice
+from typing import Any, Callable
+
+from .archive import PageArchive
+from .breaker import CircuitBreaker
+from .budget import TimeBudget
 from .config import (
+    ARCHIVE_MAX_AGE_DAYS,
+    ARCHIVE_MAX_BYTES,
+    ASYNC_CONCURRENCY,
+    ASYNC_PARSE_WORKERS,
+    BREAKER_BASE_OPEN_SECONDS,
     DEFAULT_PROVIDERS,
+    DOMAIN_JITTER_SECONDS,
     GLOBAL_CONCURRENCY,
-    REQUEST_TIMEOUT_SECONDS,
-    USER_AGENT,
+    HTTP_POOL_MAXSIZE,
+    PLACE_OFFERS_BATCH_SIZE,
+    PARSE_WORKERS,
+    PLACE_OFFERS_LOAD_CONCURRENCY,
+    RETRY_MAX_ATTEMPTS,
+    THROTTLE_STATE_PATH,
+)
+from .firestore_client import (
+    add_storage_arguments,
+    server_timestamp,
+    storage_from_args,
+)
+from .ledger import RunLedger, load_ledger, task_key
+from .metrics import RunMetrics
+from .models import ProviderParseResult, ScrapeTask
+from .priority import task_value
+from .refresh import is_due
+from .retry import RetryPolicy
+from .scheduler import DomainScheduler
+from .sessions import configure_session
+from .tasks import ScrapeContext, run_task
+from .throttle_state import (
+    load_throttle_state,
+    load_throttle_state_doc,
+    save_throttle_state,
+    save_throttle_state_doc,
 )
-from .firestore_client import get_firestore_client, server_timestamp
-from .models import ProviderParseResult
-from .providers import get_parser
 from .throttling import DomainThrottle
-from .utils import get_domain, hash_offers, now_utc
+from .utils import abandon_on_error, ignore_sigint, now_utc
+from .writer import PlaceOffersWriter
 
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
@@ -28,21 +67,52 @@ logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(mess
 
 def main() -> None:
     args = parse_args()
-    firestore = get_firestore_client(args.credentials)
-    throttle = DomainThrottle()
-    run_id = uuid.uuid4().hex
-    run_ref = firestore.collection("scrapeRuns").document(run_id)
-    run_ref.set(
-        {
-            "startedAt": server_timestamp(),
-            "status": "running",
-            "counts": {"ok": 0, "blocked": 0, "error": 0, "parse_error": 0},
-            "providers": {},
-        }
+    firestore = storage_from_args(args)
+    run_scraper(args, firestore)
+
+
+def run_scraper(args: argparse.Namespace, firestore) -> dict[str, int]:
+    configure_http_pool(args)
+    throttle = DomainThrottle(
+        jitter_seconds=tuple(args.jitter_seconds),
+        adaptive=not args.fixed_throttle,
+        breaker=CircuitBreaker(base_open_seconds=args.breaker_open_seconds),
+        min_delay=args.min_delay_seconds,
     )
+    load_state(args, throttle, firestore)
+    metrics = RunMetrics(trace=bool(args.metrics_trace))
+    budget = create_time_budget(args)
+    counts = {"ok": 0, "error": 0, "parse_error": 0}
+    provider_counts: dict[str, dict[str, int]] = {}
+    resume_keys: set[str] | None = None
+    completed_keys: set[str] = set()
+    run_id = args.resume or uuid.uuid4().hex
+    run_ref = firestore.collection("scrapeRuns").document(run_id)
+    if args.resume:
+        previous_run, planned_keys, completed_keys = load_ledger(run_ref)
+        resume_keys = planned_keys - completed_keys
+        counts.update(previous_run.get("counts") or {})
+        provider_counts = previous_run.get("providers") or {}
+        run_ref.set({"status": "running", "resumedAt": server_timestamp()}, merge=True)
+        logging.info(
+            "Resuming run %s: %s of %s tasks pending",
+            run_id,
+            len(resume_keys),
+            len(planned_keys),
+        )
+    else:
+        run_ref.set(
+            {
+                "startedAt": server_timestamp(),
+                "status": "running",
+                "counts": dict(counts),
+                "providers": {},
+            }
+        )
 
-    places = load_places(firestore)
-    if args.place_id:
+    with metrics.phase("loadPlaces"):
+        places = load_places(firestore)
+    if args.place_id and not args.resume:
         allowed = {place_id.strip() for place_id in args.place_id if place_id.strip()}
         places = [place for place in places if place.get("id") in allowed]
         missing = allowed - {place.get("id") for place in places}
@@ -50,10 +120,272 @@ def main() -> None:
             logging.warning("Place IDs not found: %s", ", ".join(sorted(missing)))
     logging.info("Loaded %s places", len(places))
 
-    tasks: list[dict[str, Any]] = []
+    with metrics.phase("loadPlaceOffers"):
+        place_offers_by_id = load_place_offers_bulk(
+            firestore, [place["id"] for place in places]
+        )
+
+    with metrics.phase("plan"):
+        tasks = plan_tasks(places, place_offers_by_id, args.force, only=resume_keys)
+    logging.info("Queued %s scrape tasks", len(tasks))
+
+    finished = 0
+
+    def tally(result: ProviderParseResult) -> None:
+        nonlocal finished
+        finished += 1
+        counts[result.status] = counts.get(result.status, 0) + 1
+        provider_stats = provider_counts.setdefault(result.provider_key, {})
+        provider_stats[result.status] = provider_stats.get(result.status, 0) + 1
+        if result.place_id is not None:
+            ledger.complete(task_key(result.place_id, result.provider_key))
+
+    archive = (
+        PageArchive(
+            args.archive_dir,
+            max_bytes=args.archive_max_mb * 1024 * 1024,
+            max_age_days=args.archive_max_age_days,
+        )
+        if args.archive_dir
+        else None
+    )
+
+    stop = threading.Event()
+    ledger: RunLedger | None = None
+    scheduler: DomainScheduler | None = None
+    try:
+        with PlaceOffersWriter(firestore, metrics=metrics) as writer, create_parse_pool(
+            args.parse_workers
+        ) as parse_pool, stop_on_signals(stop):
+            ledger = RunLedger(run_ref, writer, completed=completed_keys)
+            if resume_keys is None:
+                ledger.plan(
+                    task_key(task.place_id, task.provider_key) for task in tasks
+                )
+            context = ScrapeContext(
+                writer=writer,
+                throttle=throttle,
+                parse_pool=parse_pool,
+                archive=archive,
+                metrics=metrics,
+                stop=stop,
+                budget=budget,
+                retry=RetryPolicy(
+                    max_attempts=args.max_attempts,
+                    hedge_percentile=args.hedge_percentile,
+                ),
+            )
+            scheduler = dispatch_tasks(args, context, tasks, tally)
+            with metrics.phase("finalWrite"):
+                writer.flush()
+                ledger.checkpoint()
+    except RunInterrupted as exc:
+        logging.warning("%s; abandoning in-flight tasks", exc)
+    except Exception as exc:
+        run_ref.set(
+            {
+                "finishedAt": server_timestamp(),
+                "status": "failed",
+                "errorMessage": str(exc),
+                "counts": counts,
+                "providers": provider_counts,
+            },
+            merge=True,
+        )
+        raise
+    finally:
+        # However the run ended, the writer flushed on the way out; record
+        # what finished so --resume skips it.
+        if ledger is not None:
+            try:
+                ledger.checkpoint()
+            except Exception:
+                logging.exception("Final ledger checkpoint failed")
+        if archive is not None:
+            archive.close()
+        save_state(args, throttle, firestore)
+
+    run_metrics = metrics.summary()
+    if scheduler is not None:
+        logging.info("Worker utilization: %.0f%%", scheduler.utilization() * 100)
+        run_metrics["workerUtilization"] = round(scheduler.utilization(), 3)
+    run_metrics["documentsWritten"] = writer.documents_written
+    run_metrics["batchesCommitted"] = writer.batches_committed
+    logging.info(
+        "Wrote %s placeOffers documents in %s batches",
+        writer.documents_written,
+        writer.batches_committed,
+    )
+    logging.info("Phase seconds: %s", run_metrics["phases"])
+
+    # Tasks left unfinished by the time budget or an open circuit stay
+    # pending in the ledger for --resume.
+    deferred = len(tasks) - finished
+    if stop.is_set():
+        status = "interrupted"
+    elif deferred:
+        status = "partial"
+    else:
+        status = "done"
+    run_ref.set(
+        {
+            "finishedAt": server_timestamp(),
+            "status": status,
+            "deferredTasks": deferred,
+            "counts": counts,
+            "providers": provider_counts,
+            "metrics": run_metrics,
+        },
+        merge=True,
+    )
+    if args.metrics_prom:
+        metrics.write_prometheus(args.metrics_prom)
+    if args.metrics_trace:
+        metrics.write_trace(args.metrics_trace)
+
+    logging.info("Run %s %s: %s", run_id, status, counts)
+    if status != "done":
+        logging.info("Continue with --resume %s", run_id)
+    return counts
+
+
+def dispatch_tasks(
+    args: argparse.Namespace,
+    context: ScrapeContext,
+    tasks: list[ScrapeTask],
+    tally: Callable[[ProviderParseResult], None],
+) -> DomainScheduler | None:
+    """Run tasks on the chosen engine; returns the thread engine's scheduler."""
+    metrics = context.metrics
+    scheduler = None
+    pending_parses: list[Future] = []
+    with metrics.phase("fetch"):
+        if args.engine == "async":
+            # Imported lazily so the thread engine does not need aiohttp.
+            from .async_engine import run_tasks_async
+
+            # Parses finish inside the engine; results arrive as tasks end.
+            run_tasks_async(
+                context, tasks, tally, args.concurrency or ASYNC_CONCURRENCY
+            )
+        else:
+            scheduler = DomainScheduler(
+                context.throttle,
+                max_workers=args.concurrency or GLOBAL_CONCURRENCY,
+                budget=context.budget,
+                metrics=context.metrics,
+            )
+            for task in tasks:
+                scheduler.add(task.domain, task, task.value)
+            results = scheduler.run(
+                lambda task, slot: run_task(context, task, slot), stop=context.stop
+            )
+            for outcome in results:
+                if isinstance(outcome, Future):
+                    pending_parses.append(outcome)
+                else:
+                    tally(outcome)
+    with metrics.phase("parseDrain"):
+        for future in as_completed(pending_parses):
+            tally(future.result())
+    return scheduler
+
+
+def configure_http_pool(args: argparse.Namespace) -> None:
+    """Size the shared session's per-host pool to the threads sending requests.
+
+    That is the fetch workers, or with the async engine the parse threads
+    making follow-up requests; each keeps its own keep-alive connection.
+    """
+    if args.engine == "async":
+        senders = ASYNC_PARSE_WORKERS
+    else:
+        senders = args.concurrency or GLOBAL_CONCURRENCY
+    pool_size = args.http_pool_size or min(senders, HTTP_POOL_MAXSIZE)
+    configure_session(pool_maxsize=pool_size)
+
+
+def throttle_state_doc(firestore):
+    return firestore.collection("scraperState").document("throttle")
+
+
+def load_state(args: argparse.Namespace, throttle: DomainThrottle, firestore) -> None:
+    if args.throttle_store == "firestore":
+        try:
+            load_throttle_state_doc(throttle, throttle_state_doc(firestore))
+        except Exception:
+            logging.warning("Loading throttle state failed", exc_info=True)
+    elif args.throttle_state:
+        load_throttle_state(throttle, args.throttle_state)
+
+
+def save_state(args: argparse.Namespace, throttle: DomainThrottle, firestore) -> None:
+    try:
+        if args.throttle_store == "firestore":
+            save_throttle_state_doc(throttle, throttle_state_doc(firestore))
+        elif args.throttle_state:
+            save_throttle_state(throttle, args.throttle_state)
+    except Exception:
+        logging.warning("Saving throttle state failed", exc_info=True)
+
+
+def create_time_budget(args: argparse.Namespace) -> TimeBudget | None:
+    if args.time_budget is not None:
+        return TimeBudget.from_seconds(args.time_budget)
+    if args.deadline is not None:
+        deadline = args.deadline
+        if deadline.tzinfo is None:
+            deadline = deadline.replace(tzinfo=timezone.utc)
+        return TimeBudget.from_seconds((deadline - now_utc()).total_seconds())
+    return None
+
+
+class RunInterrupted(Exception):
+    """A second stop signal: give up on in-flight tasks and wrap up."""
+
+
+@contextmanager
+def stop_on_signals(stop: threading.Event):
+    """Turn SIGTERM/SIGINT into a graceful stop: no new tasks, finish the rest.
+
+    A second signal while stopping raises RunInterrupted to stop waiting for
+    in-flight work; the previous handlers are back in place from then on.
+    """
+    if threading.current_thread() is not threading.main_thread():
+        yield
+        return
+
+    def request_stop(signum, frame) -> None:
+        name = signal.Signals(signum).name
+        if stop.is_set():
+            for restored, handler in previous.items():
+                signal.signal(restored, handler)
+            raise RunInterrupted(f"Received {name} again")
+        logging.warning("Received %s; finishing in-flight tasks", name)
+        stop.set()
+
+    previous = {
+        signum: signal.signal(signum, request_stop)
+        for signum in (signal.SIGTERM, signal.SIGINT)
+    }
+    try:
+        yield
+    finally:
+        for signum, handler in previous.items():
+            signal.signal(signum, handler)
+
+
+def plan_tasks(
+    places: list[dict[str, Any]],
+    place_offers_by_id: dict[str, dict[str, Any]],
+    force: bool,
+    only: set[str] | None = None,
+) -> list[ScrapeTask]:
+    """Build due tasks; with ``only``, exactly those ledger keys (due or not)."""
+    tasks: list[ScrapeTask] = []
     for place in places:
         platforms = resolve_platforms(place)
-        place_offers = load_place_offers(firestore, place["id"])
+        place_offers = place_offers_by_id.get(place["id"])
         for provider_key, config in DEFAULT_PROVIDERS.items():
             provider_entry = platforms.get(provider_key) or {}
             url = provider_entry.get("url")
@@ -70,63 +402,45 @@ def main() -> None:
                 if place_offers
                 else None
             )
-            if not should_scrape(
-                existing_provider, provider_entry, config.refresh_hours, args.force
+            if only is not None:
+                if task_key(place["id"], provider_key) not in only:
+                    continue
+            elif not should_scrape(
+                existing_provider, provider_entry, config.refresh_hours, force
             ):
                 continue
             tasks.append(
-                {
-                    "place_id": place["id"],
-                    "provider_key": provider_key,
-                    "url": url,
-                    "existing_provider": existing_provider,
-                }
+                ScrapeTask(
+                    place_id=place["id"],
+                    provider_key=provider_key,
+                    url=url,
+                    existing_provider=existing_provider,
+                    revalidate=not force,
+                    value=task_value(place, existing_provider, config.refresh_hours),
+                )
             )
-
-    logging.info("Queued %s scrape tasks", len(tasks))
-
-    counts = {"ok": 0, "blocked": 0, "error": 0, "parse_error": 0}
-    provider_counts: dict[str, dict[str, int]] = {}
-
-    with ThreadPoolExecutor(max_workers=GLOBAL_CONCURRENCY) as executor:
-        futures = [
-            executor.submit(
-                run_task,
-                firestore,
-                throttle,
-                task["place_id"],
-                task["provider_key"],
-                task["url"],
-                task["existing_provider"],
-            )
-            for task in tasks
-        ]
-        for future in as_completed(futures):
-            result = future.result()
-            counts[result.status] = counts.get(result.status, 0) + 1
-            provider_stats = provider_counts.setdefault(result.provider_key, {})
-            provider_stats[result.status] = provider_stats.get(result.status, 0) + 1
-
-    run_ref.set(
-        {
-            "finishedAt": server_timestamp(),
-            "status": "done",
-            "counts": counts,
-            "providers": provider_counts,
-        },
-        merge=True,
+    tasks.sort(key=lambda task: task.value, reverse=True)
+    return tasks
+
+
+def create_parse_pool(workers: int):
+    if workers <= 0:
+        return nullcontext(None)
+    # spawn rather than fork: the parent already runs writer/HTTP threads.
+    # Workers ignore SIGINT: Ctrl-C reaches the whole process group, and a
+    # killed worker would break every pending parse.
+    return abandon_on_error(
+        ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=ignore_sigint,
+        )
     )
 
-    logging.info("Run complete: %s", counts)
-
 
-def parse_args() -> argparse.Namespace:
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Scrape dining offers for places")
-    parser.add_argument(
-        "--credentials",
-        help="Path to Firebase service account JSON",
-        default=None,
-    )
+    add_storage_arguments(parser)
     parser.add_argument(
         "--force",
         action="store_true",
@@ -137,7 +451,131 @@ def parse_args() -> argparse.Namespace:
         action="append",
         help="Restrict run to a specific placeId (repeatable)",
     )
-    return parser.parse_args()
+    parser.add_argument(
+        "--engine",
+        choices=("thread", "async"),
+        default="thread",
+        help="Run tasks on the thread pool or on an asyncio event loop",
+    )
+    parser.add_argument(
+        "--jitter-seconds",
+        type=float,
+        nargs=2,
+        metavar=("MIN", "MAX"),
+        default=DOMAIN_JITTER_SECONDS,
+        help="Random pause between requests to the same domain",
+    )
+    parser.add_argument(
+        "--fixed-throttle",
+        action="store_true",
+        help="Keep the jitter range fixed instead of adapting it per domain",
+    )
+    parser.add_argument(
+        "--min-delay-seconds",
+        type=float,
+        default=None,
+        help=(
+            "Let adaptive throttling pause less than the --jitter-seconds "
+            "minimum, down to this, and then send a second request in flight"
+        ),
+    )
+    parser.add_argument(
+        "--breaker-open-seconds",
+        type=float,
+        default=BREAKER_BASE_OPEN_SECONDS,
+        help="How long a 403/429 first opens a domain's circuit (then doubles)",
+    )
+    parser.add_argument(
+        "--throttle-state",
+        default=THROTTLE_STATE_PATH,
+        help="JSON file with learned rates and open circuits ('' to disable)",
+    )
+    parser.add_argument(
+        "--throttle-store",
+        choices=("file", "firestore"),
+        default="file",
+        help="Keep throttle state in --throttle-state or in scraperState/throttle",
+    )
+    parser.add_argument(
+        "--parse-workers",
+        type=int,
+        default=PARSE_WORKERS,
+        help="Processes for HTML parsing (0 parses in the fetch workers)",
+    )
+    parser.add_argument(
+        "--archive-dir",
+        default=None,
+        help="Store fetched pages (compressed, deduplicated) under this directory",
+    )
+    parser.add_argument(
+        "--archive-max-mb",
+        type=int,
+        default=ARCHIVE_MAX_BYTES // (1024 * 1024),
+        help="Evict least recently used archived pages beyond this size",
+    )
+    parser.add_argument(
+        "--archive-max-age-days",
+        type=int,
+        default=ARCHIVE_MAX_AGE_DAYS,
+        help="Drop archived pages older than this",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=None,
+        help="Worker threads (thread engine) or in-flight requests (async engine)",
+    )
+    parser.add_argument(
+        "--http-pool-size",
+        type=int,
+        default=None,
+        help="Keep-alive connections per host (default: one per fetch worker, "
+        f"up to {HTTP_POOL_MAXSIZE})",
+    )
+    parser.add_argument(
+        "--max-attempts",
+        type=int,
+        default=RETRY_MAX_ATTEMPTS,
+        help="Fetch attempts per task for timeouts, resets and 5xx (1 disables)",
+    )
+    parser.add_argument(
+        "--hedge-percentile",
+        type=float,
+        default=None,
+        help="Async engine: race a second request once one is slower than this "
+        "latency percentile of its domain (e.g. 95)",
+    )
+    parser.add_argument(
+        "--metrics-prom",
+        default=None,
+        help="Also write run metrics as a Prometheus textfile to this path",
+    )
+    parser.add_argument(
+        "--metrics-trace",
+        default=None,
+        help="Write a Chrome trace (JSON) of every timed phase and task",
+    )
+    budget_group = parser.add_mutually_exclusive_group()
+    budget_group.add_argument(
+        "--time-budget",
+        type=float,
+        metavar="SECONDS",
+        default=None,
+        help="Stop starting tasks that cannot finish within this many seconds",
+    )
+    budget_group.add_argument(
+        "--deadline",
+        type=datetime.fromisoformat,
+        default=None,
+        help="Like --time-budget, but until an ISO 8601 time (UTC if no offset)",
+    )
+    parser.add_argument(
+        "--resume",
+        metavar="RUN_ID",
+        default=None,
+        help="Continue an interrupted run with only its unfinished tasks",
+    )
+    return parser.parse_args(argv)
 
 
 def load_places(firestore) -> list[dict[str, Any]]:
@@ -170,11 +608,57 @@ def resolve_platforms(place: dict[str, Any]) -> dict[str, Any]:
     return platforms
 
 
-def load_place_offers(firestore, place_id: str) -> dict[str, Any] | None:
-    doc = firestore.collection("placeOffers").document(place_id).get()
-    if not doc.exists:
-        return None
-    return doc.to_dict() or None
+_PLACE_OFFERS_FIELDS = (
+    "fetchedAt",
+    "hash",
+    "status",
+    "etag",
+    "lastModified",
+    "fingerprint",
+    "parserVersion",
+    "consecutiveFailures",
+    "changeHistory",
+    "refreshHours",
+    "nextDueAt",
+)
+
+
+def load_place_offers_bulk(
+    firestore, place_ids: list[str]
+) -> dict[str, dict[str, Any]]:
+    collection = firestore.collection("placeOffers")
+    field_paths = [
+        f"providers.{provider_key}.{field}"
+        for provider_key in DEFAULT_PROVIDERS
+        for field in _PLACE_OFFERS_FIELDS
+    ]
+    chunks = list(_chunked(place_ids, PLACE_OFFERS_BATCH_SIZE))
+    if not chunks:
+        return {}
+
+    def load_chunk(chunk: list[str]) -> dict[str, dict[str, Any]]:
+        refs = [collection.document(place_id) for place_id in chunk]
+        loaded: dict[str, dict[str, Any]] = {}
+        for doc in firestore.get_all(refs, field_paths=field_paths):
+            if not doc.exists:
+                continue
+            data = doc.to_dict()
+            if data:
+                loaded[doc.id] = data
+        return loaded
+
+    place_offers: dict[str, dict[str, Any]] = {}
+    workers = min(PLACE_OFFERS_LOAD_CONCURRENCY, len(chunks))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for loaded in executor.map(load_chunk, chunks):
+            place_offers.update(loaded)
+    return place_offers
+
+
+def _chunked(items: list[str], size: int):
+    iterator = iter(items)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
 
 
 def should_scrape(
@@ -185,175 +669,8 @@ def should_scrape(
 ) -> bool:
     if force or provider_entry.get("forceRefresh"):
         return True
-    if not existing_provider:
-        return True
-    fetched_at = existing_provider.get("fetchedAt")
-    if not fetched_at:
-        return True
-    if isinstance(fetched_at, datetime):
-        fetched_at = (
-            fetched_at.replace(tzinfo=timezone.utc)
-            if fetched_at.tzinfo is None
-            else fetched_at
-        )
-    return now_utc() - fetched_at > timedelta(hours=refresh_hours)
-
-
-def run_task(
-    firestore,
-    throttle: DomainThrottle,
-    place_id: str,
-    provider_key: str,
-    url: str,
-    existing_provider: dict[str, Any] | None,
-) -> ProviderParseResult:
-    domain = get_domain(url)
-    if not domain:
-        result = ProviderParseResult(
-            provider_key=provider_key,
-            source_url=url,
-            status="error",
-            fetched_at=now_utc(),
-            offers=[],
-            raw_offer_texts=[],
-            error_message="Invalid URL",
-        )
-        write_provider_result(
-            firestore, place_id, provider_key, result, existing_provider
-        )
-        return result
-
-    if throttle.is_blocked(domain):
-        result = ProviderParseResult(
-            provider_key=provider_key,
-            source_url=url,
-            status="blocked",
-            fetched_at=now_utc(),
-            offers=[],
-            raw_offer_texts=[],
-            error_message="Domain temporarily blocked",
-        )
-        write_provider_result(
-            firestore, place_id, provider_key, result, existing_provider
-        )
-        return result
-
-    semaphore = throttle.acquire(domain)
-    try:
-        throttle.jitter_sleep()
-        response = requests.get(
-            url,
-            headers={"User-Agent": USER_AGENT},
-            timeout=REQUEST_TIMEOUT_SECONDS,
-        )
-    except requests.RequestException as exc:
-        result = ProviderParseResult(
-            provider_key=provider_key,
-            source_url=url,
-            status="error",
-            fetched_at=now_utc(),
-            offers=[],
-            raw_offer_texts=[],
-            error_message=str(exc),
-        )
-        write_provider_result(
-            firestore, place_id, provider_key, result, existing_provider
-        )
-        return result
-    finally:
-        throttle.release(semaphore)
-
-    if response.status_code in (403, 429):
-        throttle.block_domain(domain)
-        result = ProviderParseResult(
-            provider_key=provider_key,
-            source_url=url,
-            status="blocked",
-            fetched_at=now_utc(),
-            offers=[],
-            raw_offer_texts=[],
-            error_message=f"HTTP {response.status_code}",
-            http_status=response.status_code,
-        )
-        write_provider_result(
-            firestore, place_id, provider_key, result, existing_provider
-        )
-        return result
-
-    if response.status_code >= 400:
-        result = ProviderParseResult(
-            provider_key=provider_key,
-            source_url=url,
-            status="error",
-            fetched_at=now_utc(),
-            offers=[],
-            raw_offer_texts=[],
-            error_message=f"HTTP {response.status_code}",
-            http_status=response.status_code,
-        )
-        write_provider_result(
-            firestore, place_id, provider_key, result, existing_provider
-        )
-        return result
-
-    parser = get_parser(provider_key)
-    if not parser:
-        result = ProviderParseResult(
-            provider_key=provider_key,
-            source_url=url,
-            status="parse_error",
-            fetched_at=now_utc(),
-            offers=[],
-            raw_offer_texts=[],
-            error_message="Parser not implemented",
-        )
-        write_provider_result(
-            firestore, place_id, provider_key, result, existing_provider
-        )
-        return result
-
-    result = parser.parse(response.text, url)
-    write_provider_result(firestore, place_id, provider_key, result, existing_provider)
-    return result
-
-
-def write_provider_result(
-    firestore,
-    place_id: str,
-    provider_key: str,
-    result: ProviderParseResult,
-    existing_provider: dict[str, Any] | None,
-) -> None:
-    provider_update: dict[str, Any] = {
-        "sourceUrl": result.source_url,
-        "fetchedAt": result.fetched_at,
-        "status": result.status,
-        "stale": result.status != "ok",
-        "parserVersion": "0.1.0",
-    }
-
-    if result.status == "ok" and result.offers:
-        offer_dicts = [offer.to_dict() for offer in result.offers]
-        offer_hash = hash_offers(offer_dicts)
-        existing_hash = existing_provider.get("hash") if existing_provider else None
-        provider_update["hash"] = offer_hash
-        provider_update["errorMessage"] = None
-        if offer_hash != existing_hash:
-            provider_update["offers"] = offer_dicts
-            if result.raw_offer_texts:
-                provider_update["rawOfferTexts"] = result.raw_offer_texts
-    else:
-        provider_update["errorMessage"] = result.error_message
-        if result.raw_offer_texts:
-            provider_update["rawOfferTexts"] = result.raw_offer_texts
-
-    firestore.collection("placeOffers").document(place_id).set(
-        {
-            "updatedAt": server_timestamp(),
-            "providers": {provider_key: provider_update},
-        },
-        merge=True,
-    )
+    # nextDueAt follows the learned interval; older entries use refresh_hours.
+    return is_due(existing_provider, refresh_hours, now_utc())
 
 
 _SWIGGY_REST_ID_RE = re.compile(r"(?:-|/)(\d{4,})(?:/|$)")
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import threading
+from typing import Any
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .config import (
+    HTTP_POOL_CONNECTIONS,
+    HTTP_POOL_MAXSIZE,
+    REQUEST_TIMEOUT_SECONDS,
+    USER_AGENT,
+)
+
+try:  # urllib3 only decodes brotli bodies when a brotli package is installed.
+    import brotli  # noqa: F401
+
+    _ACCEPT_ENCODING = "gzip, deflate, br"
+except ImportError:
+    _ACCEPT_ENCODING = "gzip, deflate"
+
+
+_session: requests.Session | None = None
+_session_lock = threading.Lock()
+
+
+def configure_session(
+    pool_connections: int = HTTP_POOL_CONNECTIONS,
+    pool_maxsize: int = HTTP_POOL_MAXSIZE,
+) -> requests.Session:
+    """Replace the shared session with one using the given pool sizes."""
+    global _session
+    session = _build_session(pool_connections, pool_maxsize)
+    with _session_lock:
+        previous, _session = _session, session
+    if previous is not None:
+        previous.close()
+    return session
+
+
+def get_session() -> requests.Session:
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = _build_session(HTTP_POOL_CONNECTIONS, HTTP_POOL_MAXSIZE)
+        return _session
+
+
+def http_get(
+    url: str,
+    headers: dict[str, str] | None = None,
+    timeout: float = REQUEST_TIMEOUT_SECONDS,
+    **kwargs: Any,
+) -> requests.Response:
+    return get_session().get(url, headers=headers, timeout=timeout, **kwargs)
+
+
+def _build_session(pool_connections: int, pool_maxsize: int) -> requests.Session:
+    session = requests.Session()
+    # One urllib3 pool per host; connections are kept alive and reused
+    # across threads, so repeat requests skip the TCP/TLS handshake.
+    adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update(
+        {
+            "User-Agent": USER_AGENT,
+            "Accept-Encoding": _ACCEPT_ENCODING,
+            "Connection": "keep-alive",
+        }
+    )
+    return session
@@ -0,0 +1,459 @@
+from __future__ import annotations
+
+import logging
+import sqlite3
+import threading
+import time
+from concurrent.futures import Executor, Future
+from dataclasses import dataclass, field, replace
+from typing import Any, Callable, Mapping, Union
+
+import requests
+
+from .archive import PageArchive
+from .breaker import parse_retry_after
+from .budget import TimeBudget
+from .config import (
+    BREAKER_MAX_REJECTIONS,
+    DEFAULT_PROVIDERS,
+    FAILURE_PENALTY,
+    PARSER_VERSION,
+)
+from .metrics import RunMetrics
+from .models import ProviderParseResult, ScrapeTask
+from .providers import get_parser, parse_page
+from .refresh import refresh_fields
+from .retry import RetryPolicy, is_retryable_status
+from .scheduler import Requeue
+from .sessions import http_get
+from .throttling import DomainThrottle, Slot
+from .utils import hash_offers, now_utc
+from .writer import PlaceOffersWriter
+
+
+# A written result, a Future for one whose parse runs in the parse pool, or
+# a Requeue for a task rejected by its domain or due for a retry (nothing
+# written; run it later).
+TaskOutcome = Union[ProviderParseResult, Future, Requeue]
+
+
+@dataclass
+class ScrapeContext:
+    writer: PlaceOffersWriter
+    throttle: DomainThrottle
+    parse_pool: Executor | None = None
+    archive: PageArchive | None = None
+    metrics: RunMetrics = field(default_factory=RunMetrics)
+    # Set on shutdown; engines stop starting new tasks once it is set.
+    stop: threading.Event = field(default_factory=threading.Event)
+    budget: TimeBudget | None = None
+    retry: RetryPolicy = field(default_factory=RetryPolicy)
+
+
+def run_task(
+    context: ScrapeContext, task: ScrapeTask, slot: Slot | None
+) -> TaskOutcome:
+    if not task.domain:
+        return finish_task(context, task, failure_result(task, "error", "Invalid URL"))
+
+    # The scheduler acquired the domain slot before dispatching this task.
+    try:
+        started = time.perf_counter()
+        with context.metrics.timer("http", task.provider_key, task.domain):
+            response = http_get(task.url, headers=conditional_headers(task))
+        context.throttle.record_response(
+            task.domain,
+            response.status_code,
+            time.perf_counter() - started,
+            parse_retry_after(response.headers.get("Retry-After")),
+            probe=slot.probe,
+        )
+        context.metrics.add_bytes(
+            len(response.content), task.provider_key, task.domain
+        )
+    except requests.RequestException as exc:
+        if isinstance(exc, (requests.Timeout, requests.ConnectionError)):
+            context.throttle.record_timeout(task.domain)
+        return retry_or_fail(context, task, str(exc), retryable=is_transient(exc))
+    finally:
+        context.throttle.release(slot)
+
+    return handle_response(
+        context, task, response.status_code, response.text, response.headers
+    )
+
+
+def is_transient(exc: requests.RequestException) -> bool:
+    """Timeouts, resets and truncated bodies; not bad URLs or TLS failures."""
+    if isinstance(exc, requests.exceptions.SSLError):
+        return False
+    return isinstance(
+        exc,
+        (
+            requests.Timeout,
+            requests.ConnectionError,
+            requests.exceptions.ChunkedEncodingError,
+        ),
+    )
+
+
+def requeue_rejected(
+    context: ScrapeContext, task: ScrapeTask, status_code: int
+) -> TaskOutcome:
+    """Requeue a rejected task behind its domain's others, up to a limit.
+
+    A URL that is always refused would otherwise become every half-open
+    probe and keep its whole domain's circuit open.
+    """
+    rejections = task.rejections + 1
+    if rejections >= BREAKER_MAX_REJECTIONS:
+        message = f"HTTP {status_code} ({rejections} times)"
+        return finish_task(
+            context, task, failure_result(task, "error", message, status_code)
+        )
+    logging.info("HTTP %s from %s; requeueing %s", status_code, task.domain, task.url)
+    requeued = replace(
+        task, rejections=rejections, value=task.value * FAILURE_PENALTY
+    )
+    return Requeue(requeued, requeued.value)
+
+
+def retry_or_fail(
+    context: ScrapeContext,
+    task: ScrapeTask,
+    message: str,
+    status_code: int | None = None,
+    retryable: bool = True,
+) -> TaskOutcome:
+    """Requeue a retryable failure with backoff; write it once out of attempts."""
+    if retryable:
+        requeue = context.retry.requeue(task)
+        if requeue is not None:
+            logging.info(
+                "%s for %s; retry %s in %.1fs",
+                message,
+                task.url,
+                requeue.task.attempt,
+                requeue.delay,
+            )
+            return requeue
+    return finish_task(
+        context, task, failure_result(task, "error", message, status_code)
+    )
+
+
+def can_reuse_stored_offers(task: ScrapeTask) -> bool:
+    """Whether an unchanged page may keep the offers already stored for it."""
+    existing = task.existing_provider
+    return bool(
+        task.revalidate
+        and existing
+        and existing.get("status") == "ok"
+        and existing.get("parserVersion") == PARSER_VERSION
+    )
+
+
+def conditional_headers(task: ScrapeTask) -> dict[str, str]:
+    if not can_reuse_stored_offers(task):
+        return {}
+    existing = task.existing_provider
+    headers: dict[str, str] = {}
+    if existing.get("etag"):
+        headers["If-None-Match"] = existing["etag"]
+    if existing.get("lastModified"):
+        headers["If-Modified-Since"] = existing["lastModified"]
+    return headers
+
+
+def handle_response(
+    context: ScrapeContext,
+    task: ScrapeTask,
+    status_code: int,
+    body: str,
+    headers: Mapping[str, str],
+) -> TaskOutcome:
+    """Turn a response into a written result.
+
+    Returns a Future instead when parsing was handed to the parse pool; it
+    resolves to the result once the parse finished and the write was queued.
+    A 403/429 (which already tripped the domain's circuit breaker) returns a
+    Requeue so the task runs again once the domain recovers; so does a
+    provider's follow-up request failing the same way.
+    """
+    if status_code == 304:
+        result = ProviderParseResult(
+            provider_key=task.provider_key,
+            source_url=task.url,
+            status="ok",
+            fetched_at=now_utc(),
+            offers=[],
+            raw_offer_texts=[],
+            http_status=status_code,
+            not_modified=True,
+        )
+    elif status_code in (403, 429):
+        return requeue_rejected(context, task, status_code)
+    elif status_code >= 400:
+        return retry_or_fail(
+            context,
+            task,
+            f"HTTP {status_code}",
+            status_code,
+            retryable=is_retryable_status(status_code),
+        )
+    else:
+        archive_body(context, task, body)
+        try:
+            outcome = parse_body(context, task, body)
+        except FollowUpFailed as exc:
+            if exc.status_code in (403, 429):
+                return requeue_rejected(context, task, exc.status_code)
+            return retry_or_fail(context, task, str(exc), exc.status_code)
+        if isinstance(outcome, Future):
+            return _then(
+                outcome,
+                lambda parsed: _complete_response(context, task, parsed, headers),
+            )
+        result = outcome
+    return _complete_response(context, task, result, headers)
+
+
+def parse_body(context: ScrapeContext, task: ScrapeTask, body: str) -> TaskOutcome:
+    parser = get_parser(task.provider_key)
+    if not parser:
+        return failure_result(task, "parse_error", "Parser not implemented")
+
+    if context.archive is not None and hasattr(parser, "fetch_data"):
+        parser.fetch_data = context.archive.recording_fetcher(
+            task.place_id, task.provider_key, parser.fetch_data
+        )
+    if hasattr(parser, "fetch_data"):
+        parser.fetch_data = reporting_fetcher(context, task, parser.fetch_data)
+
+    fingerprint = parser.fingerprint(body)
+    if (
+        fingerprint
+        and can_reuse_stored_offers(task)
+        and task.existing_provider.get("fingerprint") == fingerprint
+    ):
+        return ProviderParseResult(
+            provider_key=task.provider_key,
+            source_url=task.url,
+            status="ok",
+            fetched_at=now_utc(),
+            offers=[],
+            raw_offer_texts=[],
+            not_modified=True,
+            fingerprint=fingerprint,
+        )
+
+    if parser.cpu_bound and context.parse_pool is not None:
+        future = context.parse_pool.submit(
+            timed_parse_page, task.provider_key, body, task.url
+        )
+
+        def record(timed: tuple[ProviderParseResult, float]) -> ProviderParseResult:
+            result, elapsed_ms = timed
+            context.metrics.observe("parse", elapsed_ms, task.provider_key, task.domain)
+            return _with_fingerprint(result, fingerprint)
+
+        return _then(future, record)
+    with context.metrics.timer("parse", task.provider_key, task.domain):
+        result = parser.parse(body, task.url)
+    return _with_fingerprint(result, fingerprint)
+
+
+class FollowUpFailed(Exception):
+    """A provider's follow-up request hit a rejection or transient failure."""
+
+    def __init__(self, message: str, status_code: int | None = None) -> None:
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def reporting_fetcher(
+    context: ScrapeContext,
+    task: ScrapeTask,
+    fetch: Callable[[str], tuple[int, str]],
+) -> Callable[[str], tuple[int, str]]:
+    """Wrap a follow-up fetch so it feeds the throttle like the page request.
+
+    Rejections and retryable failures raise FollowUpFailed out of the parser,
+    so the task is requeued or retried instead of written as an error.
+    """
+
+    def fetch_and_report(url: str) -> tuple[int, str]:
+        if context.throttle.open_seconds(task.domain) > 0:
+            raise FollowUpFailed("Circuit open for follow-up request", 429)
+        started = time.perf_counter()
+        try:
+            with context.metrics.timer("http", task.provider_key, task.domain):
+                status_code, body = fetch(url)
+        except requests.RequestException as exc:
+            if isinstance(exc, (requests.Timeout, requests.ConnectionError)):
+                context.throttle.record_timeout(task.domain)
+            if is_transient(exc):
+                raise FollowUpFailed(str(exc)) from exc
+            raise
+        context.throttle.record_response(
+            task.domain, status_code, time.perf_counter() - started
+        )
+        context.metrics.add_bytes(len(body), task.provider_key, task.domain)
+        if status_code in (403, 429) or is_retryable_status(status_code):
+            raise FollowUpFailed(f"HTTP {status_code} from {url}", status_code)
+        return status_code, body
+
+    return fetch_and_report
+
+
+def timed_parse_page(
+    provider_key: str, html: str, url: str
+) -> tuple[ProviderParseResult, float]:
+    """Parse-pool entry point; the duration excludes time queued in the pool."""
+    started = time.perf_counter()
+    result = parse_page(provider_key, html, url)
+    return result, (time.perf_counter() - started) * 1000
+
+
+def archive_body(context: ScrapeContext, task: ScrapeTask, body: str) -> None:
+    if context.archive is None:
+        return
+    try:
+        context.archive.store(
+            task.place_id, task.provider_key, task.url, body, now_utc()
+        )
+    except (OSError, sqlite3.Error):
+        logging.warning("Archiving %s failed", task.url, exc_info=True)
+
+
+def _with_fingerprint(
+    result: ProviderParseResult, fingerprint: str | None
+) -> ProviderParseResult:
+    if result.status == "ok":
+        result.fingerprint = fingerprint
+    return result
+
+
+def _complete_response(
+    context: ScrapeContext,
+    task: ScrapeTask,
+    result: ProviderParseResult,
+    headers: Mapping[str, str],
+) -> ProviderParseResult:
+    if result.status == "ok":
+        result.etag = headers.get("ETag")
+        result.last_modified = headers.get("Last-Modified")
+    return finish_task(context, task, result)
+
+
+def _then(future: Future, callback: Callable[[Any], Any]) -> Future:
+    chained: Future = Future()
+
+    def on_done(done: Future) -> None:
+        try:
+            chained.set_result(callback(done.result()))
+        except BaseException as exc:
+            chained.set_exception(exc)
+
+    future.add_done_callback(on_done)
+    return chained
+
+
+def finish_task(
+    context: ScrapeContext, task: ScrapeTask, result: ProviderParseResult
+) -> ProviderParseResult:
+    result.place_id = task.place_id
+    with context.metrics.timer("write", task.provider_key, task.domain):
+        write_provider_result(
+            context.writer,
+            task.place_id,
+            task.provider_key,
+            result,
+            task.existing_provider,
+        )
+    return result
+
+
+def failure_result(
+    task: ScrapeTask,
+    status: str,
+    error_message: str,
+    http_status: int | None = None,
+) -> ProviderParseResult:
+    return ProviderParseResult(
+        provider_key=task.provider_key,
+        source_url=task.url,
+        status=status,
+        fetched_at=now_utc(),
+        offers=[],
+        raw_offer_texts=[],
+        error_message=error_message,
+        http_status=http_status,
+    )
+
+
+def write_provider_result(
+    writer: PlaceOffersWriter,
+    place_id: str,
+    provider_key: str,
+    result: ProviderParseResult,
+    existing_provider: dict[str, Any] | None,
+) -> None:
+    provider_update: dict[str, Any] = {
+        "sourceUrl": result.source_url,
+        "fetchedAt": result.fetched_at,
+        "status": result.status,
+        "stale": result.status != "ok",
+    }
+    if result.etag:
+        provider_update["etag"] = result.etag
+    if result.last_modified:
+        provider_update["lastModified"] = result.last_modified
+    if result.fingerprint:
+        provider_update["fingerprint"] = result.fingerprint
+    config = DEFAULT_PROVIDERS.get(provider_key)
+    base_hours = config.refresh_hours if config else 24
+
+    if result.not_modified:
+        # Page (or its offer region) unchanged since the stored offers were
+        # parsed; only refresh the fetch time and validators.
+        provider_update["errorMessage"] = None
+        provider_update["consecutiveFailures"] = 0
+        provider_update.update(
+            refresh_fields(existing_provider, base_hours, result.fetched_at, False)
+        )
+        writer.submit(place_id, provider_key, provider_update)
+        return
+
+    provider_update["parserVersion"] = PARSER_VERSION
+    if result.status == "ok":
+        provider_update["consecutiveFailures"] = 0
+    elif result.status in ("error", "parse_error"):
+        # Blocks are about the domain, not this page; they do not count.
+        previous = (existing_provider or {}).get("consecutiveFailures") or 0
+        provider_update["consecutiveFailures"] = previous + 1
+    existing_hash = existing_provider.get("hash") if existing_provider else None
+    offer_dicts = [offer.to_dict() for offer in result.offers]
+    offer_hash = hash_offers(offer_dicts) if offer_dicts else None
+    provider_update.update(
+        refresh_fields(
+            existing_provider,
+            base_hours,
+            result.fetched_at,
+            offer_hash != existing_hash if result.status == "ok" else None,
+        )
+    )
+
+    if result.status == "ok" and result.offers:
+        provider_update["hash"] = offer_hash
+        provider_update["errorMessage"] = None
+        if offer_hash != existing_hash:
+            provider_update["offers"] = offer_dicts
+            if result.raw_offer_texts:
+                provider_update["rawOfferTexts"] = result.raw_offer_texts
+    else:
+        provider_update["errorMessage"] = result.error_message
+        if result.raw_offer_texts:
+            provider_update["rawOfferTexts"] = result.raw_offer_texts
+
+    writer.submit(place_id, provider_key, provider_update)
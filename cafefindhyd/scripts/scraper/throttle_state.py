@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import json
+import logging
+from pathlib import Path
+from typing import Any
+
+from .throttling import DomainThrottle
+from .utils import now_utc, write_atomic
+
+
+def throttle_state(throttle: DomainThrottle) -> dict[str, Any]:
+    return {
+        "updatedAt": now_utc().isoformat(),
+        "rates": throttle.rates(),
+        "circuits": throttle.circuits(),
+    }
+
+
+def apply_throttle_state(throttle: DomainThrottle, state: Any) -> None:
+    """Seed the throttle with rates and open circuits from an earlier run."""
+    if not isinstance(state, dict):
+        return
+    rates = state.get("rates")
+    if isinstance(rates, dict):
+        throttle.load_rates(rates)
+        logging.info("Loaded learned rates for %s domains", len(rates))
+    circuits = state.get("circuits")
+    if isinstance(circuits, dict) and circuits:
+        throttle.load_circuits(circuits)
+        logging.info("Restored circuit breakers for %s", ", ".join(sorted(circuits)))
+
+
+def load_throttle_state(throttle: DomainThrottle, path: str | Path) -> None:
+    path = Path(path)
+    if not path.exists():
+        return
+    try:
+        state = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        logging.warning("Ignoring unreadable throttle state %s", path, exc_info=True)
+        return
+    apply_throttle_state(throttle, state)
+
+
+def save_throttle_state(throttle: DomainThrottle, path: str | Path) -> None:
+    state = throttle_state(throttle)
+    write_atomic(path, json.dumps(state, indent=2, sort_keys=True))
+
+
+def load_throttle_state_doc(throttle: DomainThrottle, doc_ref) -> None:
+    snapshot = doc_ref.get()
+    if snapshot.exists:
+        apply_throttle_state(throttle, snapshot.to_dict())
+
+
+def save_throttle_state_doc(throttle: DomainThrottle, doc_ref) -> None:
+    # A single-document set() replaces the state atomically.
+    doc_ref.set(throttle_state(throttle))
@@ -3,39 +3,271 @@ from __future__ import annotations
 import random
 import threading
 import time
-from datetime import datetime, timedelta, timezone
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any
 
-from .config import BLOCK_BACKOFF_HOURS, DOMAIN_JITTER_SECONDS
+from .breaker import CircuitBreaker
+from .config import (
+    DOMAIN_JITTER_SECONDS,
+    DOMAIN_MAX_IN_FLIGHT,
+    THROTTLE_BACKOFF_FACTOR,
+    THROTTLE_DELAY_STEP_SECONDS,
+    THROTTLE_INCREASE_AFTER,
+    THROTTLE_LATENCY_SPIKE_FACTOR,
+    THROTTLE_LATENCY_SPIKE_MIN_SECONDS,
+    THROTTLE_MAX_DELAY_SECONDS,
+    THROTTLE_MAX_IN_FLIGHT,
+)
+from .utils import now_utc
+
+
+@dataclass
+class DomainRate:
+    """Learned pacing for one domain: pause between requests and parallelism."""
+
+    delay: float
+    max_in_flight: int
+    latency: float | None = None
+    healthy_streak: int = 0
+
+    def to_dict(self) -> dict[str, Any]:
+        stored: dict[str, Any] = {
+            "delay": round(self.delay, 3),
+            "maxInFlight": self.max_in_flight,
+        }
+        if self.latency is not None:
+            stored["latency"] = round(self.latency, 3)
+        return stored
+
+
+@dataclass(frozen=True)
+class Slot:
+    """A request slot granted by ``DomainThrottle.try_acquire``.
+
+    ``probe`` is the breaker's ID when this request is a half-open probe;
+    pass it to ``record_response`` and hand the slot back to ``release``.
+    """
+
+    domain: str
+    probe: int | None = None
 
 
 class DomainThrottle:
-    def __init__(self) -> None:
-        self._locks: dict[str, threading.Semaphore] = {}
-        self._blocked_until: dict[str, datetime] = {}
+    """Per-domain request spacing based on a next-allowed-time schedule.
+
+    A domain gets a slot when it has fewer than its allowed requests running
+    and its next allowed time has passed. Releasing a slot schedules the next
+    one a randomised delay later, so nothing sleeps while holding it.
+
+    With ``adaptive`` the delay and parallelism follow AIMD: every
+    ``THROTTLE_INCREASE_AFTER`` healthy responses shave a fixed step off the
+    delay; a 429/403, a timeout or a latency spike multiplies the delay and
+    halves the parallelism. Neither pauses nor the learned delay go below
+    ``jitter_seconds[0]``, and parallelism stays at ``max_in_flight``. An
+    explicit ``min_delay`` lowers that floor and, once a domain reaches it,
+    allows up to ``THROTTLE_MAX_IN_FLIGHT`` requests in flight.
+    ``rates()``/``load_rates()`` carry the learned values between runs.
+
+    Independently of that, 403/429 responses trip the domain's
+    ``CircuitBreaker``: no slots are granted while it is open, and a single
+    probe is let through once it turns half-open. Only the probe's own
+    response can close the circuit again.
+    """
+
+    def __init__(
+        self,
+        jitter_seconds: tuple[float, float] = DOMAIN_JITTER_SECONDS,
+        max_in_flight: int = DOMAIN_MAX_IN_FLIGHT,
+        adaptive: bool = True,
+        breaker: CircuitBreaker | None = None,
+        min_delay: float | None = None,
+    ) -> None:
+        low, high = jitter_seconds
+        self._initial_delay = (low + high) / 2
+        # Jitter stays proportional to the (learned) delay.
+        self._spread = (high - low) / (high + low) if high + low > 0 else 0.0
+        self._min_delay = low if min_delay is None else min_delay
+        self._max_delay = max(THROTTLE_MAX_DELAY_SECONDS, high)
+        self._initial_in_flight = max_in_flight
+        self._max_in_flight = (
+            max_in_flight
+            if min_delay is None
+            else max(max_in_flight, THROTTLE_MAX_IN_FLIGHT)
+        )
+        self._adaptive = adaptive
+        self._rates: dict[str, DomainRate] = {}
+        self._next_allowed: dict[str, float] = {}
+        self._in_flight: dict[str, int] = {}
+        self.breaker = breaker or CircuitBreaker()
         self._lock = threading.Lock()
 
-    def acquire(self, domain: str) -> threading.Semaphore:
+    def try_acquire(self, domain: str) -> Slot | None:
         with self._lock:
-            semaphore = self._locks.setdefault(domain, threading.Semaphore(1))
-        semaphore.acquire()
-        return semaphore
+            return self._try_acquire_locked(domain)
 
-    def release(self, semaphore: threading.Semaphore) -> None:
-        semaphore.release()
+    def release(self, slot: Slot) -> None:
+        domain = slot.domain
+        with self._lock:
+            self._in_flight[domain] = max(0, self._in_flight.get(domain, 0) - 1)
+            if slot.probe is not None:
+                self.breaker.release_probe(domain, slot.probe)
+            delay = self._rate_locked(domain).delay
+            pause = max(
+                self._min_delay,
+                delay * random.uniform(1 - self._spread, 1 + self._spread),
+            )
+            self._next_allowed[domain] = max(
+                self._next_allowed.get(domain, 0.0), time.monotonic() + pause
+            )
+
+    def record_response(
+        self,
+        domain: str,
+        status_code: int,
+        latency_seconds: float,
+        retry_after: float | None = None,
+        probe: int | None = None,
+    ) -> None:
+        """Feed a response into the domain's breaker and rate controller.
 
-    def is_blocked(self, domain: str) -> bool:
+        ``probe`` is the ``Slot.probe`` the request was sent with.
+        """
+        if not domain:
+            return
         with self._lock:
-            blocked_until = self._blocked_until.get(domain)
-        if not blocked_until:
-            return False
-        return datetime.now(timezone.utc) < blocked_until
+            if status_code in (403, 429):
+                self.breaker.record_rejection(domain, time.monotonic(), retry_after)
+            elif status_code < 400:
+                self.breaker.record_success(domain, probe)
+            if not self._adaptive:
+                return
+            rate = self._rate_locked(domain)
+            if status_code in (403, 429):
+                self._back_off_locked(rate)
+            elif status_code >= 500:
+                rate.healthy_streak = 0
+            elif rate.latency is not None and _is_latency_spike(
+                latency_seconds, rate.latency
+            ):
+                self._back_off_locked(rate)
+            else:
+                self._speed_up_locked(rate)
+            rate.latency = (
+                latency_seconds
+                if rate.latency is None
+                else 0.8 * rate.latency + 0.2 * latency_seconds
+            )
 
-    def block_domain(self, domain: str, hours: int = BLOCK_BACKOFF_HOURS) -> None:
+    def record_timeout(self, domain: str) -> None:
+        if not self._adaptive or not domain:
+            return
         with self._lock:
-            self._blocked_until[domain] = datetime.now(timezone.utc) + timedelta(
-                hours=hours
+            self._back_off_locked(self._rate_locked(domain))
+
+    def rates(self) -> dict[str, dict[str, Any]]:
+        with self._lock:
+            return {domain: rate.to_dict() for domain, rate in self._rates.items()}
+
+    def load_rates(self, rates: dict[str, dict[str, Any]]) -> None:
+        with self._lock:
+            for domain, stored in rates.items():
+                try:
+                    delay = float(stored["delay"])
+                    max_in_flight = int(stored["maxInFlight"])
+                    latency = stored.get("latency")
+                    latency = float(latency) if latency is not None else None
+                except (KeyError, TypeError, ValueError):
+                    continue
+                self._rates[domain] = DomainRate(
+                    delay=min(max(delay, self._min_delay), self._max_delay),
+                    max_in_flight=min(max(max_in_flight, 1), self._max_in_flight),
+                    latency=latency,
+                )
+
+    def circuits(self) -> dict[str, dict[str, Any]]:
+        """Tripped circuit breakers, with wall-clock times for persisting."""
+        with self._lock:
+            snapshot = self.breaker.snapshot(time.monotonic())
+        now = now_utc()
+        return {
+            domain: {
+                "trips": trips,
+                "openUntil": (now + timedelta(seconds=open_seconds)).isoformat(),
+            }
+            for domain, (trips, open_seconds) in snapshot.items()
+        }
+
+    def load_circuits(self, circuits: dict[str, dict[str, Any]]) -> None:
+        now = now_utc()
+        with self._lock:
+            for domain, stored in circuits.items():
+                try:
+                    trips = int(stored["trips"])
+                    open_until = datetime.fromisoformat(stored["openUntil"])
+                    open_seconds = (open_until - now).total_seconds()
+                except (KeyError, TypeError, ValueError):
+                    continue
+                self.breaker.restore(domain, trips, open_seconds, time.monotonic())
+
+    def ready_at(self, domain: str) -> float:
+        """Monotonic time at which ``domain`` may send next (inf while full)."""
+        with self._lock:
+            return self._ready_at_locked(domain)
+
+    def open_seconds(self, domain: str) -> float:
+        """How much longer the domain's circuit stays open (0 if not open)."""
+        with self._lock:
+            return self.breaker.open_seconds(domain, time.monotonic())
+
+    def _rate_locked(self, domain: str) -> DomainRate:
+        rate = self._rates.get(domain)
+        if rate is None:
+            rate = self._rates[domain] = DomainRate(
+                delay=self._initial_delay, max_in_flight=self._initial_in_flight
             )
+        return rate
+
+    def _speed_up_locked(self, rate: DomainRate) -> None:
+        rate.healthy_streak += 1
+        if rate.healthy_streak < THROTTLE_INCREASE_AFTER:
+            return
+        rate.healthy_streak = 0
+        if rate.delay > self._min_delay:
+            rate.delay = max(self._min_delay, rate.delay - THROTTLE_DELAY_STEP_SECONDS)
+        elif rate.max_in_flight < self._max_in_flight:
+            rate.max_in_flight += 1
+
+    def _back_off_locked(self, rate: DomainRate) -> None:
+        rate.healthy_streak = 0
+        rate.delay = min(
+            self._max_delay,
+            max(rate.delay, self._min_delay, 0.1) * THROTTLE_BACKOFF_FACTOR,
+        )
+        rate.max_in_flight = max(1, rate.max_in_flight // 2)
+
+    def _try_acquire_locked(self, domain: str) -> Slot | None:
+        in_flight = self._in_flight.get(domain, 0)
+        now = time.monotonic()
+        if in_flight >= self._rate_locked(domain).max_in_flight:
+            return None
+        if now < self._next_allowed.get(domain, 0.0):
+            return None
+        # Checked last: a half-open breaker hands out its probe here.
+        if not self.breaker.allows(domain, now):
+            return None
+        self._in_flight[domain] = in_flight + 1
+        return Slot(domain, self.breaker.probe(domain))
+
+    def _ready_at_locked(self, domain: str) -> float:
+        if self._in_flight.get(domain, 0) >= self._rate_locked(domain).max_in_flight:
+            return float("inf")
+        return max(self._next_allowed.get(domain, 0.0), self.breaker.ready_at(domain))
+
 
-    def jitter_sleep(self) -> None:
-        min_seconds, max_seconds = DOMAIN_JITTER_SECONDS
-        time.sleep(random.uniform(min_seconds, max_seconds))
+def _is_latency_spike(latency: float, average: float) -> bool:
+    """Much slower than the average, by a margin jitter alone won't reach."""
+    return (
+        latency > average * THROTTLE_LATENCY_SPIKE_FACTOR
+        and latency - average >= THROTTLE_LATENCY_SPIKE_MIN_SECONDS
+    )
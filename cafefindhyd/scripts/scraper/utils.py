@@ -2,14 +2,58 @@ from __future__ import annotations
 
 import hashlib
 import json
+import os
+import signal
+from concurrent.futures import Executor
+from contextlib import contextmanager
 from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Iterator, TypeVar
 from urllib.parse import urlparse
 
+ExecutorT = TypeVar("ExecutorT", bound=Executor)
+
 
 def now_utc() -> datetime:
     return datetime.now(timezone.utc)
 
 
+def as_utc(value: Any) -> datetime | None:
+    """``value`` as an aware datetime (naive means UTC); None if not a datetime."""
+    if not isinstance(value, datetime):
+        return None
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+
+def ignore_sigint() -> None:
+    """Worker-process initializer: Ctrl-C is for the parent to handle."""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+@contextmanager
+def abandon_on_error(executor: ExecutorT) -> Iterator[ExecutorT]:
+    """Shut ``executor`` down on exit, without waiting if the block raised.
+
+    On an error or interrupt, queued work is cancelled and running work is
+    left to finish in the background instead of holding up the unwind.
+    """
+    try:
+        yield executor
+    except BaseException:
+        executor.shutdown(wait=False, cancel_futures=True)
+        raise
+    executor.shutdown()
+
+
+def write_atomic(path: str | Path, content: str) -> None:
+    """Write then rename, so a killed process never leaves a truncated file."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary = path.with_name(path.name + ".tmp")
+    temporary.write_text(content, encoding="utf-8")
+    os.replace(temporary, path)
+
+
 def get_domain(url: str) -> str:
     try:
         return urlparse(url).netloc.lower()
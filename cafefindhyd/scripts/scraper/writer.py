@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import logging
+import threading
+from typing import Any
+
+from .config import (
+    FIRESTORE_BATCH_LIMIT,
+    WRITE_FLUSH_INTERVAL_SECONDS,
+    WRITE_FLUSH_THRESHOLD,
+)
+from .firestore_client import server_timestamp
+from .metrics import RunMetrics
+
+
+class PlaceOffersWriter:
+    """Write-behind sink that coalesces provider updates per place document."""
+
+    def __init__(
+        self,
+        firestore,
+        flush_threshold: int = WRITE_FLUSH_THRESHOLD,
+        flush_interval: float = WRITE_FLUSH_INTERVAL_SECONDS,
+        batch_limit: int = FIRESTORE_BATCH_LIMIT,
+        metrics: RunMetrics | None = None,
+    ) -> None:
+        self._firestore = firestore
+        self._metrics = metrics or RunMetrics()
+        self._flush_threshold = flush_threshold
+        self._flush_interval = flush_interval
+        self._batch_limit = batch_limit
+        self._pending: dict[str, dict[str, dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="place-offers-writer", daemon=True
+        )
+        self.documents_written = 0
+        self.batches_committed = 0
+        self._thread.start()
+
+    def __enter__(self) -> "PlaceOffersWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def submit(
+        self, place_id: str, provider_key: str, provider_update: dict[str, Any]
+    ) -> None:
+        with self._lock:
+            providers = self._pending.setdefault(place_id, {})
+            providers.setdefault(provider_key, {}).update(provider_update)
+            pending_count = len(self._pending)
+        if pending_count >= self._flush_threshold:
+            self._wake.set()
+
+    def flush(self) -> bool:
+        """Commit everything submitted so far; False if any batch failed."""
+        committed = True
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+            items = list(pending.items())
+            for start in range(0, len(items), self._batch_limit):
+                chunk = items[start : start + self._batch_limit]
+                try:
+                    self._commit(chunk)
+                except Exception:
+                    logging.exception(
+                        "placeOffers batch write failed (%s docs)", len(chunk)
+                    )
+                    self._requeue(chunk)
+                    committed = False
+        return committed
+
+    def close(self) -> None:
+        self._closed.set()
+        self._wake.set()
+        self._thread.join()
+        self.flush()
+        with self._lock:
+            dropped = len(self._pending)
+        if dropped:
+            logging.error("Dropped %s unwritten placeOffers updates", dropped)
+
+    def _run(self) -> None:
+        while not self._closed.is_set():
+            self._wake.wait(self._flush_interval)
+            self._wake.clear()
+            if self._closed.is_set():
+                break
+            self.flush()
+
+    def _commit(self, chunk: list[tuple[str, dict[str, dict[str, Any]]]]) -> None:
+        collection = self._firestore.collection("placeOffers")
+        batch = self._firestore.batch()
+        for place_id, providers in chunk:
+            batch.set(
+                collection.document(place_id),
+                {"updatedAt": server_timestamp(), "providers": providers},
+                merge=True,
+            )
+        with self._metrics.timer("commit"):
+            batch.commit()
+        self.documents_written += len(chunk)
+        self.batches_committed += 1
+
+    def _requeue(self, chunk: list[tuple[str, dict[str, dict[str, Any]]]]) -> None:
+        with self._lock:
+            for place_id, providers in chunk:
+                current = self._pending.setdefault(place_id, {})
+                # Updates submitted since the failed flush are newer; keep them.
+                for provider_key, update in providers.items():
+                    merged = dict(update)
+                    merged.update(current.get(provider_key, {}))
+                    current[provider_key] = merged
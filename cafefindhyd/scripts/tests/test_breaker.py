@@ -0,0 +1,94 @@
+from scripts.scraper.breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+from scripts.scraper.throttling import DomainThrottle
+
+DOMAIN = "example.com"
+
+
+def test_straggler_success_while_open_is_ignored():
+    breaker = CircuitBreaker(base_open_seconds=10)
+    breaker.record_rejection(DOMAIN, now=0.0, retry_after=60)
+
+    breaker.record_success(DOMAIN)
+
+    assert breaker.state(DOMAIN).state == OPEN
+    assert breaker.open_seconds(DOMAIN, now=0.0) == 60
+
+
+def test_only_the_probe_closes_a_half_open_circuit():
+    breaker = CircuitBreaker(base_open_seconds=10)
+    breaker.record_rejection(DOMAIN, now=0.0)
+    assert breaker.allows(DOMAIN, now=10.0)
+    probe = breaker.probe(DOMAIN)
+
+    breaker.record_success(DOMAIN)
+    assert breaker.state(DOMAIN).state == HALF_OPEN
+
+    breaker.record_success(DOMAIN, probe)
+    assert breaker.state(DOMAIN).state == CLOSED
+
+
+def test_straggler_release_keeps_the_probe_claimed():
+    throttle = DomainThrottle(
+        jitter_seconds=(0.0, 0.0),
+        max_in_flight=2,
+        adaptive=False,
+        breaker=CircuitBreaker(base_open_seconds=0.0),
+    )
+    straggler = throttle.try_acquire(DOMAIN)
+    # Opens the circuit, which turns half-open straight away.
+    throttle.record_response(DOMAIN, 429, 0.1)
+    probe = throttle.try_acquire(DOMAIN)
+    assert probe is not None and probe.probe is not None
+
+    throttle.release(straggler)
+
+    assert throttle.try_acquire(DOMAIN) is None
+    throttle.release(probe)
+    assert throttle.try_acquire(DOMAIN) is not None
+
+
+def test_circuit_goes_closed_open_half_open_closed():
+    breaker = CircuitBreaker(base_open_seconds=10)
+    assert breaker.allows(DOMAIN, now=0.0)
+
+    assert breaker.record_rejection(DOMAIN, now=0.0) == 10
+    assert breaker.state(DOMAIN).state == OPEN
+    assert not breaker.allows(DOMAIN, now=9.9)
+
+    assert breaker.allows(DOMAIN, now=10.0)
+    assert breaker.state(DOMAIN).state == HALF_OPEN
+    # Only the one probe gets through while half-open.
+    assert not breaker.allows(DOMAIN, now=10.0)
+
+    breaker.record_success(DOMAIN, breaker.probe(DOMAIN))
+    assert breaker.state(DOMAIN).state == CLOSED
+    assert breaker.state(DOMAIN).trips == 0
+    assert breaker.allows(DOMAIN, now=10.0)
+
+
+def test_rejected_probe_reopens_with_a_longer_backoff():
+    breaker = CircuitBreaker(base_open_seconds=10, max_open_seconds=30)
+    breaker.record_rejection(DOMAIN, now=0.0)
+    assert breaker.allows(DOMAIN, now=10.0)
+
+    assert breaker.record_rejection(DOMAIN, now=10.0) == 20
+    assert breaker.allows(DOMAIN, now=30.0)
+    assert breaker.record_rejection(DOMAIN, now=30.0) == 30
+
+
+def test_retry_after_extends_the_open_period():
+    breaker = CircuitBreaker(base_open_seconds=10)
+
+    assert breaker.record_rejection(DOMAIN, now=0.0, retry_after=45) == 45
+    assert not breaker.allows(DOMAIN, now=44.0)
+
+
+def test_probe_without_a_verdict_frees_the_next_probe():
+    breaker = CircuitBreaker(base_open_seconds=10)
+    breaker.record_rejection(DOMAIN, now=0.0)
+    assert breaker.allows(DOMAIN, now=10.0)
+
+    breaker.release_probe(DOMAIN, breaker.probe(DOMAIN))
+
+    assert breaker.state(DOMAIN).state == HALF_OPEN
+    assert breaker.allows(DOMAIN, now=10.0)
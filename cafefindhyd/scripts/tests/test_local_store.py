@@ -0,0 +1,36 @@
+import pytest
+
+from scripts.scraper.local_store import MemoryFirestore, SqliteFirestore
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        return MemoryFirestore()
+    return SqliteFirestore(tmp_path / "store.sqlite3")
+
+
+def _ids(query):
+    return [snapshot.id for snapshot in query.stream()]
+
+
+def test_where_supports_comparison_and_in_operators(store):
+    places = store.collection("places")
+    places.document("a").set({"rating": 3.5, "slug": "a"})
+    places.document("b").set({"rating": 4, "slug": "b"})
+    places.document("c").set({"rating": "4", "slug": "c"})
+    places.document("d").set({"slug": "d"})
+
+    assert _ids(places.where("rating", "==", 4)) == ["b"]
+    assert _ids(places.where("rating", ">=", 3.5)) == ["a", "b"]
+    assert _ids(places.where("rating", "<", 4)) == ["a"]
+    assert _ids(places.where("slug", "in", ["b", "d"])) == ["b", "d"]
+    assert _ids(places.where("rating", ">", 3).where("slug", "<=", "a")) == ["a"]
+
+
+def test_where_rejects_unsupported_operators(store):
+    places = store.collection("places")
+    with pytest.raises(ValueError, match="array-contains"):
+        places.where("tags", "array-contains", "cafe")
+    with pytest.raises(ValueError):
+        places.where("slug", "in", "a")
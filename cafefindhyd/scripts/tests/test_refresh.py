@@ -0,0 +1,39 @@
+from datetime import datetime, timedelta, timezone
+
+from scripts.scraper.config import REFRESH_MAX_GROWTH, REFRESH_MIN_HOURS
+from scripts.scraper.refresh import adaptive_refresh_hours
+
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def _history(changes, every_hours=24):
+    return [
+        {"at": START + timedelta(hours=every_hours * index), "changed": changed}
+        for index, changed in enumerate(changes)
+    ]
+
+
+def test_short_history_keeps_the_base_interval():
+    assert adaptive_refresh_hours(_history([True, True]), base_hours=24) == 24
+
+
+def test_pages_that_change_every_fetch_are_fetched_more_often():
+    hours = adaptive_refresh_hours(_history([True] * 8), base_hours=24)
+
+    assert REFRESH_MIN_HOURS <= hours < 24
+
+
+def test_rarely_changing_pages_back_off_within_the_growth_limit():
+    history = _history([True] + [False] * 7)
+
+    hours = adaptive_refresh_hours(history, base_hours=24, previous_hours=24)
+
+    assert hours == 24 * REFRESH_MAX_GROWTH
+
+
+def test_a_change_shrinks_the_interval():
+    history = _history([True] + [False] * 6 + [True])
+
+    hours = adaptive_refresh_hours(history, base_hours=24, previous_hours=48)
+
+    assert hours <= 48 / REFRESH_MAX_GROWTH
@@ -0,0 +1,60 @@
+from scripts.scraper.budget import TimeBudget
+from scripts.scraper.scheduler import DomainScheduler, Requeue
+from scripts.scraper.throttling import DomainThrottle
+
+
+def _scheduler(**kwargs):
+    throttle = DomainThrottle(jitter_seconds=(0, 0), max_in_flight=1)
+    return throttle, DomainScheduler(throttle, max_workers=2, **kwargs)
+
+
+def test_each_domain_serves_its_most_valuable_task_first():
+    throttle, scheduler = _scheduler()
+    for name, value in [("low", 1), ("high", 3), ("mid", 2)]:
+        scheduler.add("a.example", name, value)
+
+    def handler(task, slot):
+        throttle.release(slot)
+        return task
+
+    assert list(scheduler.run(handler)) == ["high", "mid", "low"]
+
+
+def test_requeued_task_runs_again_after_its_delay():
+    throttle, scheduler = _scheduler()
+    scheduler.add("a.example", "task")
+    calls = []
+
+    def handler(task, slot):
+        throttle.release(slot)
+        calls.append(task)
+        if len(calls) == 1:
+            return Requeue(task, delay=0.05)
+        return task
+
+    assert list(scheduler.run(handler)) == ["task"]
+    assert calls == ["task", "task"]
+
+
+def test_tasks_that_cannot_finish_in_time_are_deferred():
+    budget = TimeBudget.from_seconds(5, reserve_seconds=0, default_task_seconds=10)
+    throttle, scheduler = _scheduler(budget=budget)
+    scheduler.add("slow.example", "slow")
+
+    assert list(scheduler.run(lambda task, slot: task)) == []
+    assert scheduler.deferred == ["slow"]
+    assert budget.deferred == 1
+
+
+def test_domains_with_a_long_open_circuit_are_deferred():
+    throttle, scheduler = _scheduler(max_breaker_wait=30)
+    throttle.record_response("a.example", 429, 0.1, retry_after=600)
+    scheduler.add("a.example", "rejected")
+    scheduler.add("b.example", "other")
+
+    def handler(task, slot):
+        throttle.release(slot)
+        return task
+
+    assert list(scheduler.run(handler)) == ["other"]
+    assert scheduler.deferred == ["rejected"]
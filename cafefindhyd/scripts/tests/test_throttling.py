@@ -0,0 +1,75 @@
+import time
+
+from scripts.scraper import throttling
+from scripts.scraper.config import (
+    THROTTLE_BACKOFF_FACTOR,
+    THROTTLE_INCREASE_AFTER,
+    THROTTLE_MAX_IN_FLIGHT,
+)
+from scripts.scraper.throttling import DomainThrottle
+
+DOMAIN = "example.com"
+
+
+def _speed_up(throttle, rounds=50, latency=0.5):
+    for _ in range(rounds * THROTTLE_INCREASE_AFTER):
+        throttle.record_response(DOMAIN, 200, latency)
+    return throttle.rates()[DOMAIN]
+
+
+def test_learned_delay_stays_at_the_jitter_minimum():
+    rate = _speed_up(DomainThrottle(jitter_seconds=(5, 20), max_in_flight=1))
+
+    assert rate["delay"] == 5
+    assert rate["maxInFlight"] == 1
+
+
+def test_explicit_min_delay_allows_faster_pacing():
+    throttle = DomainThrottle(jitter_seconds=(5, 20), max_in_flight=1, min_delay=2)
+
+    rate = _speed_up(throttle)
+
+    assert rate["delay"] == 2
+    assert rate["maxInFlight"] == THROTTLE_MAX_IN_FLIGHT
+
+
+def test_pauses_never_go_below_the_floor(monkeypatch):
+    throttle = DomainThrottle(jitter_seconds=(5, 20))
+    _speed_up(throttle)
+    # The shortest jittered pause around the learned 5 s delay is 2 s.
+    monkeypatch.setattr(throttling.random, "uniform", lambda low, high: low)
+
+    throttle.release(throttle.try_acquire(DOMAIN))
+
+    assert throttle.ready_at(DOMAIN) - time.monotonic() > 4.9
+
+
+def test_small_latency_jumps_are_not_spikes():
+    throttle = DomainThrottle(jitter_seconds=(5, 20), max_in_flight=1, min_delay=2)
+    _speed_up(throttle, latency=0.05)
+    before = throttle.rates()[DOMAIN]
+
+    throttle.record_response(DOMAIN, 200, 0.5)
+    assert throttle.rates()[DOMAIN]["maxInFlight"] == before["maxInFlight"]
+
+    throttle.record_response(DOMAIN, 200, 5.0)
+    assert throttle.rates()[DOMAIN]["maxInFlight"] == before["maxInFlight"] // 2
+
+
+def test_rejection_doubles_the_delay_and_halves_parallelism():
+    throttle = DomainThrottle(jitter_seconds=(5, 20), max_in_flight=1, min_delay=2)
+    before = _speed_up(throttle)
+
+    throttle.record_response(DOMAIN, 429, 0.5)
+
+    after = throttle.rates()[DOMAIN]
+    assert after["delay"] == before["delay"] * THROTTLE_BACKOFF_FACTOR
+    assert after["maxInFlight"] == before["maxInFlight"] // 2
+
+
+def test_open_circuit_grants_no_slots():
+    throttle = DomainThrottle(jitter_seconds=(0, 0))
+    throttle.record_response(DOMAIN, 429, 0.1, retry_after=60)
+
+    assert throttle.try_acquire(DOMAIN) is None
+    assert throttle.open_seconds(DOMAIN) > 59
@@ -0,0 +1,31 @@
+from scripts.scraper.local_store import MemoryFirestore
+from scripts.scraper.writer import PlaceOffersWriter
+
+
+def test_updates_to_one_place_are_coalesced_into_one_document():
+    firestore = MemoryFirestore()
+    with PlaceOffersWriter(firestore, flush_threshold=100) as writer:
+        writer.submit("place", "zomato", {"status": "error"})
+        writer.submit("place", "zomato", {"status": "ok", "offers": []})
+        writer.submit("place", "eazydiner", {"status": "ok"})
+        writer.submit("other", "zomato", {"status": "ok"})
+        assert writer.flush()
+
+    assert writer.documents_written == 2
+    assert writer.batches_committed == 1
+    providers = firestore.collection("placeOffers").document("place").get()
+    assert providers.to_dict()["providers"] == {
+        "zomato": {"status": "ok", "offers": []},
+        "eazydiner": {"status": "ok"},
+    }
+
+
+def test_large_flushes_are_split_into_batches():
+    firestore = MemoryFirestore()
+    with PlaceOffersWriter(firestore, flush_threshold=100, batch_limit=2) as writer:
+        for index in range(5):
+            writer.submit(f"place-{index}", "zomato", {"status": "ok"})
+        writer.flush()
+
+    assert writer.documents_written == 5
+    assert writer.batches_committed == 3